@@ -0,0 +1,267 @@
+import argparse
+import math
+import random
+
+import numpy as np
+
+from cli import write_json
+from controllers import BatchPIDController
+
+# Analysis runs the velocity loop of GridSimulation.move: the PID turns the
+# velocity error into an acceleration, which the drive integrates into velocity
+DEFAULT_LIMITS = {"min_output": -3, "max_output": 15, "accel_rate": 2.0}  # As GridNavigation
+GAINS = ("kp", "ki", "kd")
+
+# Step-response metrics, per gain set
+STEP_METRICS = ("rise_time", "settling_time", "overshoot", "steady_state_error")
+
+
+def step(times, amplitude=10.0, start=0.0):
+    """Reference jumping from 0 to ``amplitude`` at ``start``."""
+    return np.where(times >= start, amplitude, 0.0)
+
+
+def ramp(times, slope=2.0, start=0.0):
+    """Reference rising at ``slope`` per second from ``start``."""
+    return slope * np.maximum(times - start, 0.0)
+
+
+def chirp(times, amplitude=1.0, f0=0.01, f1=2.0):
+    """Sine sweeping exponentially from ``f0`` to ``f1`` Hz over the whole run.
+
+    An exponential sweep spends equal time per octave, so every decade of a
+    Bode plot gets the same excitation.
+    """
+    duration = times[-1] - times[0]
+    rate = math.log(f1 / f0) / duration
+    phase = 2 * math.pi * f0 * np.expm1(rate * (times - times[0])) / rate
+    return amplitude * np.sin(phase)
+
+
+def disturbance(times, amplitude=-5.0, start=10.0, duration=0.5):
+    """Acceleration pulse of ``amplitude`` px/s² (a bump or a gust) from ``start`` for ``duration`` s."""
+    return np.where((times >= start) & (times < start + duration), amplitude, 0.0)
+
+
+SIGNALS = {"step": step, "ramp": ramp, "chirp": chirp, "disturbance": disturbance}
+
+
+def controllers(gain_sets, saturate=True, **limits):
+    """One BatchPIDController for a list of {kp, ki, kd} gain sets (e.g. tuning candidates).
+
+    ``limits`` override DEFAULT_LIMITS; ``saturate=False`` lifts the output and
+    jerk limits, leaving the linear PID loop.
+    """
+    limits = {**DEFAULT_LIMITS, **limits}
+    if not saturate:
+        limits = {"min_output": -math.inf, "max_output": math.inf, "accel_rate": math.inf}
+    kp, ki, kd = ([g[name] for g in gain_sets] for name in GAINS)
+    return BatchPIDController(kp, ki, kd, size=len(gain_sets), **limits)
+
+
+def simulate(pid, reference, time_step=0.05, disturbance=None):
+    """Run the closed velocity loop of every controller in ``pid`` over one reference.
+
+    ``reference`` (and ``disturbance``, an acceleration added by the world) are
+    per-tick arrays, shared by all controllers or one row each. Returns the
+    velocity after every tick and the commanded acceleration, shape (N, T).
+    """
+    pid.reset()
+    n, ticks = len(pid), np.shape(reference)[-1]
+    reference = np.broadcast_to(reference, (n, ticks))
+    if disturbance is not None:
+        disturbance = np.broadcast_to(disturbance, (n, ticks))
+    velocity = np.zeros(n)
+    velocities = np.empty((n, ticks))
+    accelerations = np.empty((n, ticks))
+    with np.errstate(over="ignore", invalid="ignore"):  # Unstable gains diverge to inf/nan (see stable)
+        for k in range(ticks):
+            acceleration = pid.compute(reference[:, k], velocity, time_step)
+            accelerations[:, k] = acceleration
+            if disturbance is not None:
+                acceleration = acceleration + disturbance[:, k]
+            velocity = velocity + acceleration * time_step
+            velocities[:, k] = velocity
+    return velocities, accelerations
+
+
+def stable(outputs, scale, limit=1e3):
+    """Rows that stayed finite and within ``limit`` times ``scale`` (False for diverging gains)."""
+    with np.errstate(invalid="ignore"):
+        return np.isfinite(outputs).all(axis=1) & (np.abs(outputs).max(axis=1) < limit * abs(scale))
+
+
+def _first(mask, times):
+    """Time of the first True along each row, inf where there is none."""
+    hit = mask.any(axis=1)
+    return np.where(hit, times[mask.argmax(axis=1)], math.inf)
+
+
+def _settled_after(times, deviation, band, start=0.0):
+    """Time from ``start`` until each row's |deviation| stays within ``band`` (see metrics.settling_time)."""
+    outside = (np.abs(deviation) > band) & (times >= start)
+    if not outside.shape[1]:
+        return np.zeros(len(outside))
+    last = outside.shape[1] - 1 - outside[:, ::-1].argmax(axis=1)
+    settled_at = np.where(last < outside.shape[1] - 1, times[np.minimum(last + 1, len(times) - 1)], math.inf)
+    return np.where(outside.any(axis=1), settled_at - start, 0.0)
+
+
+def step_metrics(times, outputs, amplitude, start=0.0, band=0.02, tail=0.1):
+    """Rise time (10-90%), settling time (within ``band`` of the amplitude), overshoot and
+    steady-state error (over the last ``tail`` of the run) of step responses, one per row.
+    """
+    after = times >= start
+    final = outputs[:, -max(1, int(len(times) * tail)):].mean(axis=1)
+    rise = _first((outputs >= 0.9 * amplitude) & after, times) - _first((outputs >= 0.1 * amplitude) & after, times)
+    return {
+        "rise_time": np.nan_to_num(rise, nan=math.inf),
+        "settling_time": _settled_after(times, outputs - amplitude, band * abs(amplitude), start),
+        "overshoot": np.maximum(0.0, outputs.max(axis=1) - amplitude) / abs(amplitude),
+        "steady_state_error": amplitude - final,
+    }
+
+
+def tracking_error(reference, outputs, tail=0.1):
+    """Mean error over the last ``tail`` of the run (e.g. the lag behind a ramp), one per row."""
+    span = max(1, int(np.shape(reference)[-1] * tail))
+    return (np.broadcast_to(reference, outputs.shape)[:, -span:] - outputs[:, -span:]).mean(axis=1)
+
+
+def disturbance_metrics(times, outputs, setpoint, start, band=0.02):
+    """Peak deviation from ``setpoint`` after a disturbance at ``start``, and the time to recover."""
+    deviation = outputs - setpoint
+    return {
+        "peak_deviation": np.abs(np.where(times >= start, deviation, 0.0)).max(axis=1),
+        "recovery_time": _settled_after(times, deviation, band * abs(setpoint), start),
+    }
+
+
+def frequency_response(pid, time_step=0.05, duration=300.0, amplitude=1.0, f0=0.01, f1=2.0, points=50):
+    """Estimated closed-loop response (velocity / reference) of every controller to a chirp.
+
+    All controllers run on the same chirp; one batched FFT of their outputs
+    against the reference gives the response at every frequency bin, which is
+    averaged onto ``points`` log-spaced frequencies between ``f0`` and ``f1``.
+    With the output and jerk limits in place this is the response at this
+    ``amplitude``, not a linearization: large or fast signals saturate.
+    Returns (frequencies, complex response of shape (N, points)).
+    """
+    times = np.arange(int(round(duration / time_step))) * time_step
+    reference = chirp(times, amplitude, f0, f1)
+    outputs, _ = simulate(pid, reference, time_step)
+    return estimate_response(reference, outputs, time_step, f0, f1, points)
+
+
+def estimate_response(reference, outputs, time_step=0.05, f0=0.01, f1=2.0, points=50):
+    """Closed-loop response of simulated ``outputs`` to a chirp ``reference`` (see frequency_response)."""
+    # Hann window: the loop starts at rest and the sweep stops mid-cycle
+    ticks = len(reference)
+    window = np.hanning(ticks)
+    U = np.fft.rfft(reference * window)
+    Y = np.fft.rfft(outputs * window, axis=1)
+    freqs = np.fft.rfftfreq(ticks, time_step)
+
+    edges = np.geomspace(f0, f1, points + 1)
+    bins = np.digitize(freqs, edges) - 1
+    cross = Y * U.conj()  # Cross and auto spectra, averaged per band (H1 estimator)
+    power = (U * U.conj()).real
+    keep = [b for b in range(points) if (bins == b).any()]  # Low bands can be narrower than one bin
+    response = np.empty((len(outputs), len(keep)), dtype=complex)
+    for column, b in enumerate(keep):
+        inside = bins == b
+        response[:, column] = cross[:, inside].sum(axis=1) / power[inside].sum()
+    centers = np.sqrt(edges[:-1] * edges[1:])
+    return centers[keep], response
+
+
+def bandwidth(freqs, response):
+    """Lowest frequency where each response drops 3 dB below its low-frequency gain (inf if never)."""
+    gain = np.abs(response)
+    below = gain < gain[:, :1] / math.sqrt(2)
+    return np.where(below.any(axis=1), freqs[below.argmax(axis=1)], math.inf)
+
+
+def bode(freqs, response):
+    """Magnitude (dB) and unwrapped phase (degrees) of frequency responses."""
+    with np.errstate(divide="ignore"):
+        magnitude = 20 * np.log10(np.abs(response))
+    return magnitude, np.degrees(np.unwrap(np.angle(response), axis=-1))
+
+
+def analyze(gain_sets, time_step=0.05, duration=30.0, amplitude=10.0, saturate=True, chirp_amplitude=1.0,
+            chirp_duration=300.0):
+    """Every check for a list of gain sets, batched: one dict of per-gain-set metrics each.
+
+    A gain set is ``stable`` only if its loop stays bounded under every signal:
+    a set can settle on a step yet diverge under the chirp or the disturbance.
+    """
+    pid = controllers(gain_sets, saturate)
+    times = np.arange(int(round(duration / time_step))) * time_step
+
+    outputs, _ = simulate(pid, step(times, amplitude), time_step)
+    steady = stable(outputs, amplitude)
+    with np.errstate(invalid="ignore", over="ignore"):
+        metrics = step_metrics(times, outputs, amplitude)
+
+        ramp_reference = ramp(times, amplitude / duration * 2)
+        outputs, _ = simulate(pid, ramp_reference, time_step)
+        steady &= stable(outputs, amplitude)
+        metrics["ramp_error"] = tracking_error(ramp_reference, outputs)
+
+        start = duration / 2
+        outputs, _ = simulate(pid, step(times, amplitude), time_step, disturbance(times, -amplitude, start))
+        steady &= stable(outputs, amplitude)
+        metrics.update(disturbance_metrics(times, outputs, amplitude, start))
+
+        chirp_times = np.arange(int(round(chirp_duration / time_step))) * time_step
+        chirp_reference = chirp(chirp_times, chirp_amplitude)
+        outputs, _ = simulate(pid, chirp_reference, time_step)
+        steady &= stable(outputs, chirp_amplitude)
+        freqs, response = estimate_response(chirp_reference, outputs, time_step)
+        magnitude, phase = bode(freqs, response)
+        metrics["bandwidth"] = bandwidth(freqs, response)
+        metrics["peak_gain_db"] = np.max(magnitude, axis=1)
+    # Numbers from a diverging loop mean nothing: report them as inf, like a mission that never arrives
+    metrics = {name: np.where(steady, values, math.inf) for name, values in metrics.items()}
+
+    return [{"params": gains, "stable": bool(steady[i]), **{name: float(values[i]) for name, values in metrics.items()},
+             "bode": {"freq": freqs.tolist(), "magnitude_db": magnitude[i].tolist(), "phase_deg": phase[i].tolist()}}
+            for i, gains in enumerate(gain_sets)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step, ramp, disturbance and frequency analysis of PIDController")
+    parser.add_argument("--kp", type=float, default=2.0)
+    parser.add_argument("--ki", type=float, default=0.1)
+    parser.add_argument("--kd", type=float, default=0.5)
+    parser.add_argument("--sweep", type=int, default=0,
+                        help="Also analyze this many random gain sets from the grid tuning space (see tuning.py)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-step", type=float, default=0.05)
+    parser.add_argument("--amplitude", type=float, default=10.0, help="Step size (px/s)")
+    parser.add_argument("--linear", action="store_true", help="Lift the output and jerk limits")
+    parser.add_argument("--output", help="Write every result, with its Bode data, as JSON to this file "
+                                         "(inf and nan are written as null)")
+    args = parser.parse_args()
+
+    gain_sets = [{"kp": args.kp, "ki": args.ki, "kd": args.kd}]
+    if args.sweep:
+        from tuning import SPACES, random_candidates
+        gain_sets += random_candidates(SPACES["grid"], args.sweep, random.Random(args.seed))
+    results = analyze(gain_sets, args.time_step, amplitude=args.amplitude, saturate=not args.linear)
+
+    columns = STEP_METRICS + ("ramp_error", "peak_deviation", "recovery_time", "bandwidth", "peak_gain_db")
+    widths = [max(len(name) + 2, 10) for name in columns]
+    print(f"{'kp':>7}{'ki':>7}{'kd':>7}" + "".join(f"{name:>{w}}" for name, w in zip(columns, widths)))
+    for r in sorted(results, key=lambda r: r["settling_time"]):
+        gains = r["params"]
+        print(f"{gains['kp']:>7.3f}{gains['ki']:>7.3f}{gains['kd']:>7.3f}"
+              + "".join(f"{r[name]:>{w}.3f}" for name, w in zip(columns, widths)))
+
+    if args.output:
+        write_json(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from controllers import PIDController, GoalController
+from simulation import GridSimulation, GoalSimulation, random_spawn
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "benchmark_baseline.json")  # Committed: compared relative to the reference
+
+
+def _best_rate(run, repeats=3, min_time=0.2):
+    """Best-of-``repeats`` operations per second; ``run(n)`` performs n operations."""
+    n = 1
+    while True:  # Calibrate n so one repeat lasts at least min_time
+        start = time.perf_counter()
+        run(n)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        n *= 2
+    best = n / elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        run(n)
+        best = max(best, n / (time.perf_counter() - start))
+    return best
+
+
+def bench_reference():
+    """Fixed workload independent of the repo's code, in loops per second.
+
+    It is timed around every benchmark, and results are compared with the
+    baseline relative to it, so a run on a slower or busier machine does not
+    read as a regression.
+    """
+    import numpy as np
+    values = np.linspace(0.0, 1.0, 64)
+
+    def run(n):
+        acc = 0.0
+        for i in range(n):
+            x = i * 1e-3
+            acc += (x * 0.5 + 1.0) / (x + 1.0) - x * x
+            acc += float(values.sum()) * 1e-9
+        return acc
+    return _best_rate(run)
+
+
+def bench_pid_compute():
+    """PIDController.compute calls per second."""
+    pid = PIDController(kp=2.0, ki=0.1, kd=0.5, min_output=-3, max_output=15)
+
+    def run(n):
+        compute = pid.compute
+        for i in range(n):
+            compute(100.0, i * 0.001, 0.1)
+    return _best_rate(run)
+
+
+def bench_compute_pid():
+    """PIDNavigation.compute_pid calls per second (the GoalController law it delegates to)."""
+    controller = GoalController()
+
+    def run(n):
+        compute = controller.compute
+        for i in range(n):
+            compute(200.0 - i * 1e-4, 0.05, 45.0)
+    return _best_rate(run)
+
+
+def bench_mpc_plan():
+    """MPCController.plan calls per second (one batched rollout of every sample each)."""
+    from mpc import MPCController
+    controller = MPCController()
+
+    def run(n):
+        plan = controller.plan
+        for i in range(n):
+            plan(-150.0, -150.0, 45.0, 1.0, 0.05)
+    return _best_rate(run)
+
+
+def bench_grid_mission():
+    """Simulated steps per second for a full headless draw_grid mission."""
+    steps = GridSimulation().run().steps
+
+    def run(n):
+        for _ in range(n):
+            GridSimulation(record=False).run()
+    return _best_rate(run) * steps
+
+
+def bench_goal_mission():
+    """Simulated steps per second for full headless goal1 missions from seeded spawns."""
+    starts = [random_spawn(300, 300, random.Random(seed)) for seed in range(16)]
+    steps = sum(GoalSimulation(start=(x, y, 0)).run().steps for x, y in starts)
+
+    def run(n):
+        for _ in range(n):
+            for x, y in starts:
+                GoalSimulation(start=(x, y, 0), record=False).run()
+    return _best_rate(run) * steps
+
+
+def bench_visualization_update(history_lengths=(1000, 10000, 100000), frames=200):
+    """Seconds per Visualization.update (one redraw per call) after each history length."""
+    import matplotlib
+    matplotlib.use("Agg")  # Measure drawing cost without a window
+    import matplotlib.pyplot as plt
+    from visualization import Visualization
+
+    costs = {}
+    for length in history_lengths:
+        vis = Visualization()
+        vis.frame_interval = float("inf")  # Fill the history without drawing
+        for i in range(length):
+            vis.update(i * 0.1, i % 50, i % 7)
+        vis.frame_interval = 0  # Then redraw on every update
+        start = time.perf_counter()
+        for i in range(length, length + frames):
+            vis.update(i * 0.1, i % 50, i % 7)
+        costs[length] = (time.perf_counter() - start) / frames
+        plt.close(vis.fig)
+    return costs
+
+
+def bench_startup(repeats=5):
+    """Seconds to start a Python process and import main.py."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import main"], cwd=HERE, check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_benchmarks(selected=None):
+    """Run the suite; return {name: {"value", "unit", "higher_is_better", "reference"}}.
+
+    ``reference`` is the mean rate of the reference workload timed just before
+    and just after the benchmark: the machine's speed while it ran, which can
+    drift within one run on a shared machine.
+    """
+    results = {}
+
+    def record(name, unit, higher_is_better, value, reference):
+        results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better, "reference": reference}
+        print(f"  {name:<34} {value:>14.6g} {unit:<9} (reference {reference:.4g} loops/s)")
+
+    def measure(bench):
+        before = bench_reference()
+        value = bench()
+        return value, (before + bench_reference()) / 2
+
+    def wanted(name):
+        return selected is None or any(name.startswith(s) for s in selected)
+
+    for name, bench, unit, higher_is_better in (("pid_compute", bench_pid_compute, "calls/s", True),
+                                                 ("compute_pid", bench_compute_pid, "calls/s", True),
+                                                 ("mpc_plan", bench_mpc_plan, "calls/s", True),
+                                                 ("grid_mission", bench_grid_mission, "steps/s", True),
+                                                 ("goal_mission", bench_goal_mission, "steps/s", True)):
+        if wanted(name):
+            record(name, unit, higher_is_better, *measure(bench))
+    if wanted("visualization_update"):
+        costs, reference = measure(bench_visualization_update)
+        for length, cost in costs.items():
+            record(f"visualization_update_{length}", "s/update", False, cost, reference)
+    if wanted("startup"):
+        record("startup", "s", False, *measure(bench_startup))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the benchmarks that got worse than the baseline by more than ``tolerance``.
+
+    Each baseline value is first scaled by how much faster or slower the
+    reference workload ran around that benchmark than when the baseline was
+    saved (the "speed" column).
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["value"], result["value"]
+        speed = 1.0
+        if "reference" in result and "reference" in baseline[name]:
+            speed = result["reference"] / baseline[name]["reference"]
+        old = old * speed if result["higher_is_better"] else old / speed
+        change = (new - old) / old if old else 0
+        worse = -change if result["higher_is_better"] else change
+        status = "REGRESSION" if worse > tolerance else "ok"
+        print(f"  {name:<34} {old:>12.6g} -> {new:<12.6g} {change:+7.1%}  speed {speed:.2f}x  {status}")
+        if worse > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the control, simulation and render hot paths")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results (JSON)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (fraction)")
+    parser.add_argument("--only", nargs="*", help="Run only benchmarks whose names start with these prefixes")
+    args = parser.parse_args()
+
+    print("Running benchmarks...")
+    results = run_benchmarks(args.only)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f"No baseline at {args.baseline}; save one with --save-baseline")
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    print("Compared with baseline:")
+    if compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
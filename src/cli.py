@@ -0,0 +1,31 @@
+import argparse
+import json
+import math
+
+# Helpers shared by the command-line tools (main.py and the tools it dispatches to)
+
+
+def positive_int(text):
+    """Parse a count that must be at least 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"expected at least 1, got {value}")
+    return value
+
+
+def json_safe(value):
+    """``value`` with every non-finite float replaced by None, since JSON has no inf or nan."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
+
+
+def write_json(path, value):
+    """Write ``value`` to ``path`` as strict JSON (inf and nan become null)."""
+    with open(path, "w") as f:
+        json.dump(json_safe(value), f, indent=2, allow_nan=False)
+        f.write("\n")
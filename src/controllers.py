@@ -0,0 +1,149 @@
+class PIDController:
+    """PID Controller with gradual acceleration transitions."""
+    def __init__(self, kp, ki, kd, min_output, max_output, accel_rate=2.0):
+        self.kp = kp  # Proportional Gain
+        self.ki = ki  # Integral Gain
+        self.kd = kd  # Derivative Gain
+        self.min_output = min_output  # Lower bound (for deceleration)
+        self.max_output = max_output  # Upper bound (for acceleration)
+        self.accel_rate = accel_rate  # Maximum rate of change of acceleration (px/s³)
+        self.prev_error = 0
+        self.integral = 0
+        self.derivative = 0
+        self.current_acceleration = 0  # Smoothly controlled acceleration
+
+    def compute(self, target, current, dt):
+        """Compute the PID output with smooth acceleration changes."""
+        error = target - current
+        self.integral += error * dt
+        self.derivative = derivative = (error - self.prev_error) / dt if dt > 0 else 0
+        self.prev_error = error
+
+        # Compute desired acceleration from PID
+        desired_acceleration = self.kp * error + self.ki * self.integral + self.kd * derivative
+
+        # Gradually adjust acceleration within the allowed rate of change
+        if desired_acceleration > self.current_acceleration:
+            self.current_acceleration += min(self.accel_rate * dt, desired_acceleration - self.current_acceleration)
+        else:
+            self.current_acceleration -= min(self.accel_rate * dt, self.current_acceleration - desired_acceleration)
+
+        # Clamp final acceleration within bounds
+        self.current_acceleration = max(self.min_output, min(self.current_acceleration, self.max_output))
+
+        return self.current_acceleration
+
+
+class BatchPIDController:
+    """N PIDControllers stepped together; state and gains are NumPy arrays.
+
+    NumPy is imported inside the methods, so the scalar controllers (and the
+    headless missions using them) never load it.
+    """
+    def __init__(self, kp, ki, kd, min_output, max_output, accel_rate=2.0, size=None):
+        import numpy as np
+        gains = [np.asarray(g, dtype=float) for g in (kp, ki, kd, min_output, max_output, accel_rate)]
+        shape = np.broadcast_shapes(*(g.shape for g in gains)) if size is None else (size,)
+        self.kp, self.ki, self.kd, self.min_output, self.max_output, self.accel_rate = (
+            np.broadcast_to(g, shape).copy() for g in gains)
+        self.prev_error = np.zeros(shape)
+        self.integral = np.zeros(shape)
+        self.current_acceleration = np.zeros(shape)
+
+    @classmethod
+    def from_controllers(cls, controllers):
+        """Stack scalar PIDControllers (gains and state) into one batch."""
+        batch = cls(*([getattr(c, name) for c in controllers]
+                      for name in ("kp", "ki", "kd", "min_output", "max_output", "accel_rate")))
+        batch.prev_error[:] = [c.prev_error for c in controllers]
+        batch.integral[:] = [c.integral for c in controllers]
+        batch.current_acceleration[:] = [c.current_acceleration for c in controllers]
+        return batch
+
+    def __len__(self):
+        return len(self.kp)
+
+    def reset(self):
+        """Zero the integral, previous error and acceleration of every controller."""
+        self.prev_error[:] = 0
+        self.integral[:] = 0
+        self.current_acceleration[:] = 0
+
+    def compute(self, targets, currents, dt):
+        """Compute N PID outputs with smooth acceleration changes in one step."""
+        import numpy as np
+        error = np.subtract(targets, currents)
+        self.integral += error * dt
+        with np.errstate(divide="ignore", invalid="ignore"):
+            derivative = np.where(np.greater(dt, 0), (error - self.prev_error) / dt, 0.0)
+        self.prev_error = error
+
+        # Compute desired acceleration from PID
+        desired_acceleration = self.kp * error + self.ki * self.integral + self.kd * derivative
+
+        # Gradually adjust acceleration within the allowed rate of change
+        max_change = self.accel_rate * dt
+        self.current_acceleration += np.clip(desired_acceleration - self.current_acceleration, -max_change, max_change)
+
+        # Clamp final acceleration within bounds
+        np.clip(self.current_acceleration, self.min_output, self.max_output, out=self.current_acceleration)
+
+        return self.current_acceleration.copy()
+
+
+def goal_law(distance_error, angle_error, Kv, Kω, Kω2, max_ω):
+    """The goal1 linear/angular velocity law: (v, ω) for floats, or NumPy arrays of agents."""
+    # **Dynamic Linear Velocity (v) based on distance and ω**
+    v = Kv * distance_error * (1 / (1 + abs(angle_error) / 30))  # Reduce v if angle error is large
+
+    # **Dynamic Angular Velocity (ω) based on angle error**
+    ω = Kω * angle_error + Kω2 * (angle_error / (1 + abs(v)))
+    ω = ω.clip(-max_ω, max_ω) if hasattr(ω, "clip") else max(min(ω, max_ω), -max_ω)
+    return v, ω
+
+
+def prioritize_rotation(v, angle_error):
+    """Halve v while the heading is more than 30° off the goal (floats or arrays)."""
+    return v * (1 - 0.5 * (abs(angle_error) > 30))
+
+
+class GoalController:
+    """Adaptive linear/angular velocity law used by the goal1 PID navigation."""
+    def __init__(self, Kv=0.8, Kω=0.1, Kω2=0.05, max_ω=20):
+        self.Kv = Kv  # Linear velocity gain
+        self.Kω = Kω  # Base angular correction
+        self.Kω2 = Kω2  # Extra term to ensure ω is strong when v is high
+        self.max_ω = max_ω  # Limit ω to avoid extreme turning
+        self.prev_error = 0
+        self.integral = 0
+        self.derivative = 0
+
+    def compute(self, distance_error, dt, angle_error):
+        """Compute linear velocity (v) and angular velocity (ω) dynamically."""
+        self.integral += distance_error * dt
+        self.derivative = (distance_error - self.prev_error) / dt if dt > 0 else 0
+        v, ω = goal_law(distance_error, angle_error, self.Kv, self.Kω, self.Kω2, self.max_ω)
+        self.prev_error = distance_error
+        return v, ω
+
+
+class BatchGoalController:
+    """GoalController for N agents at once; errors and state are NumPy arrays."""
+    def __init__(self, size, Kv=0.8, Kω=0.1, Kω2=0.05, max_ω=20):
+        import numpy as np
+        self.Kv = Kv
+        self.Kω = Kω
+        self.Kω2 = Kω2
+        self.max_ω = max_ω
+        self.prev_error = np.zeros(size)
+        self.integral = np.zeros(size)
+        self.derivative = np.zeros(size)
+
+    def compute(self, distance_error, dt, angle_error):
+        """Compute linear velocity (v) and angular velocity (ω) arrays in one step."""
+        import numpy as np
+        self.integral += distance_error * dt
+        self.derivative = (distance_error - self.prev_error) / dt if dt > 0 else np.zeros_like(self.integral)
+        v, ω = goal_law(distance_error, angle_error, self.Kv, self.Kω, self.Kω2, self.max_ω)
+        self.prev_error = np.array(distance_error, dtype=float)
+        return v, ω
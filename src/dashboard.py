@@ -0,0 +1,179 @@
+import multiprocessing
+import struct
+from multiprocessing import shared_memory
+
+_HEADER = struct.Struct("q")  # Rows written so far (monotonic sequence number)
+
+
+class SharedRing:
+    """Lock-free single-writer ring of float rows in shared memory.
+
+    The writer packs each row into its slot and then publishes it by bumping
+    the sequence counter, so ``update`` never waits on a reader. Readers keep
+    their own cursor and copy whatever is new; if a reader falls more than
+    ``capacity`` rows behind, the oldest rows are dropped rather than ever
+    blocking the writer. Instances pickle by name, so a simulation in another
+    process can attach to a ring created here.
+    """
+
+    def __init__(self, capacity, columns, name=None):
+        self.capacity = capacity
+        self.columns = columns
+        self.row = struct.Struct(f"{columns}d")
+        size = _HEADER.size + capacity * self.row.size
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        if self.owner:
+            _HEADER.pack_into(self.shm.buf, 0, 0)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self.written = _HEADER.unpack_from(self.buf, 0)[0]
+        self.cursor = 0  # Reader position
+        self._rows = None  # NumPy view, created on first read
+
+    def __getstate__(self):
+        return {"capacity": self.capacity, "columns": self.columns, "name": self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["capacity"], state["columns"], state["name"])
+
+    def update(self, *row):
+        """Append one row (e.g. time and plotted values); never blocks."""
+        slot = self.written % self.capacity
+        self.row.pack_into(self.buf, _HEADER.size + slot * self.row.size, *row)
+        self.written += 1
+        _HEADER.pack_into(self.buf, 0, self.written)  # Publish after the row is complete
+
+    def read(self):
+        """Return the rows written since the last read as an (n, columns) array."""
+        import numpy as np
+        if self._rows is None:
+            self._rows = np.ndarray((self.capacity, self.columns), dtype=float,
+                                    buffer=self.buf, offset=_HEADER.size)
+        published = _HEADER.unpack_from(self.buf, 0)[0]
+        start = max(self.cursor, published - self.capacity)
+        index = np.arange(start, published) % self.capacity
+        rows = self._rows[index]  # Fancy indexing copies
+        # The writer may have lapped us while copying; drop rows it could have overwritten
+        lapped = _HEADER.unpack_from(self.buf, 0)[0] - self.capacity + 1
+        if lapped > start:
+            rows = rows[lapped - start:]
+        self.cursor = published
+        return rows
+
+    def close(self):
+        self._rows = self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _plot(streams, fields, capacity, fps, history, done):
+    """Plotter process: poll every stream once per frame and redraw."""
+    import matplotlib.pyplot as plt
+    from visualization import DecimatedHistory, History, RingBuffer, minmax_downsample
+
+    rings = [SharedRing(*spec) for _, spec in streams]
+    windows = [RingBuffer(capacity, len(fields) + 1) for _ in rings]
+    histories = [DecimatedHistory(len(fields) + 1, history) if history else History(len(fields) + 1)
+                 for _ in rings]
+
+    plt.ion()
+    fig, axs = plt.subplots(len(fields), 1, figsize=(8, 3 * len(fields)), squeeze=False)
+    axs = axs[:, 0]
+    lines = []
+    for ax, field in zip(axs, fields):
+        title = field.replace("_", " ").capitalize()
+        ax.set_title(f"{title} vs Time")
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel(title)
+        lines.append([ax.plot([], [], label=label)[0] for label, _ in streams])
+        ax.legend(loc="upper right")
+        ax.grid(True)
+
+    def drain():
+        for ring, window, history in zip(rings, windows, histories):
+            for row in ring.read():
+                window.append(row)
+                history.append(row)
+
+    def draw(sources, buckets=0):
+        for column, (ax, field_lines) in enumerate(zip(axs, lines), start=1):
+            for line, source in zip(field_lines, sources):
+                data = source.view()
+                line.set_data(*minmax_downsample(data[:, 0], data[:, column], buckets))
+            ax.relim()
+            ax.autoscale_view()
+        fig.canvas.draw_idle()
+
+    interval = 1.0 / fps
+    while plt.fignum_exists(fig.number):
+        finished = done.is_set()  # Checked before draining so no rows are missed
+        drain()
+        if finished:
+            break
+        draw(windows)
+        plt.pause(interval)  # Only this process waits on the GUI
+
+    if plt.fignum_exists(fig.number):
+        # Writers are done: show the whole run, one bucket per pixel
+        draw(histories, int(fig.get_size_inches()[0] * fig.dpi))
+        plt.ioff()
+        plt.show()
+    for ring in rings:
+        ring.close()
+
+
+class Dashboard:
+    """Live plots drawn by a separate process, fed through shared memory.
+
+    Each named stream is a ``SharedRing`` with one writer; any number of
+    simulations (in this process or others) can stream into one window,
+    shown as one line per stream on each field's axes. The control loops only
+    pay for a struct pack per sample, however slow the plot window is.
+    ``history`` bounds the rows kept for the final plot (see DecimatedHistory).
+    """
+
+    def __init__(self, streams=("run",), fields=("velocity", "acceleration"), capacity=2000, fps=20,
+                 buffer_size=8192, history=None):
+        self.fields = tuple(fields)
+        self.streams = {label: SharedRing(buffer_size, len(self.fields) + 1) for label in streams}
+        self.done = multiprocessing.get_context("spawn").Event()
+        specs = [(label, (ring.capacity, ring.columns, ring.name)) for label, ring in self.streams.items()]
+        # A fresh interpreter, so the plotter shares no GUI state with turtle/Tk here
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=_plot, args=(specs, self.fields, capacity, fps, history, self.done), daemon=True)
+        self.process.start()
+
+    def stream(self, label):
+        """Writer for one stream; pass it to PlotObserver or to another process."""
+        return self.streams[label]
+
+    def show(self):
+        """Mark every stream finished and wait until the plot window is closed."""
+        self.done.set()
+        self.process.join()
+        self.close()
+
+    def close(self):
+        self.done.set()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        for ring in self.streams.values():
+            ring.close()
+        self.streams = {}
+
+
+class ProcessVisualization:
+    """Drop-in replacement for Visualization that plots out of process."""
+
+    def __init__(self, fields=("velocity", "acceleration"), capacity=2000, fps=20, history=None):
+        self.dashboard = Dashboard(fields=fields, capacity=capacity, fps=fps, history=history)
+        self.ring = self.dashboard.stream("run")
+
+    def update(self, time_elapsed, *values):
+        self.ring.update(time_elapsed, *values)
+
+    def show(self):
+        self.dashboard.show()
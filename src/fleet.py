@@ -0,0 +1,194 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from controllers import BatchGoalController, prioritize_rotation
+from geometry import goal_errors_batch
+
+FleetResult = namedtuple("FleetResult", ["reached", "arrival_time", "x", "y", "heading", "collisions", "steps"])
+
+# Cell offsets visiting each neighbouring cell pair once: own cell plus half the 8-neighbourhood
+_HALF_STENCIL = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+_KEY_SPAN = 1 << 21  # Cell index range per axis packed into one int64 key
+_KEY_SHIFT = 1 << 20
+
+
+class SpatialGrid:
+    """Uniform hash grid over points, rebuilt per tick with one sort (O(N log N)).
+
+    Queries only touch neighbouring cells, so finding every pair closer than
+    ``cell_size`` costs O(N + pairs) instead of O(N²).
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.order = np.empty(0, dtype=np.int64)
+        self.keys = np.empty(0, dtype=np.int64)
+
+    def _cell_keys(self, xs, ys):
+        ix = np.floor_divide(xs, self.cell_size).astype(np.int64) + _KEY_SHIFT
+        iy = np.floor_divide(ys, self.cell_size).astype(np.int64) + _KEY_SHIFT
+        return ix * _KEY_SPAN + iy
+
+    def build(self, xs, ys):
+        """Index the given positions."""
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        keys = self._cell_keys(self.xs, self.ys)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        return self
+
+    def _cell_ranges(self, keys):
+        return (np.searchsorted(self.keys, keys, side="left"),
+                np.searchsorted(self.keys, keys, side="right"))
+
+    def pairs_within(self, radius):
+        """Return index arrays (i, j), i != j, of every pair closer than ``radius`` (<= cell_size)."""
+        n = len(self.keys)
+        position = np.arange(n)
+        found_i, found_j = [], []
+        for dx, dy in _HALF_STENCIL:
+            start, end = self._cell_ranges(self.keys + dx * _KEY_SPAN + dy)
+            if dx == 0 and dy == 0:
+                start = position + 1  # Same cell: only later entries, so each pair appears once
+            counts = np.maximum(end - start, 0)
+            total = counts.sum()
+            if not total:
+                continue
+            # Ragged expansion: pair each point with every entry of its neighbour cell
+            first = np.repeat(position, counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            second = np.repeat(start, counts) + offsets
+            found_i.append(self.order[first])
+            found_j.append(self.order[second])
+
+        if not found_i:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        i = np.concatenate(found_i)
+        j = np.concatenate(found_j)
+        close = np.hypot(self.xs[i] - self.xs[j], self.ys[i] - self.ys[j]) < radius
+        return i[close], j[close]
+
+    def buckets(self):
+        """Return {(cell x, cell y): index array} for every occupied cell."""
+        starts = np.flatnonzero(np.diff(self.keys, prepend=-1))
+        cells = self.keys[starts]
+        return {(int(key // _KEY_SPAN) - _KEY_SHIFT, int(key % _KEY_SPAN) - _KEY_SHIFT): indices
+                for key, indices in zip(cells.tolist(), np.split(self.order, starts[1:]))}
+
+    def neighbours(self, x, y, radius):
+        """Return indices of indexed points within ``radius`` (<= cell_size) of (x, y)."""
+        cx = int(np.floor(x / self.cell_size)) + _KEY_SHIFT
+        cy = int(np.floor(y / self.cell_size)) + _KEY_SHIFT
+        keys = np.array([(cx + dx) * _KEY_SPAN + cy + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+        start, end = self._cell_ranges(keys)
+        candidates = np.concatenate([self.order[s:e] for s, e in zip(start, end)])
+        close = np.hypot(self.xs[candidates] - x, self.ys[candidates] - y) < radius
+        return candidates[close]
+
+
+class FleetSimulation:
+    """Vectorized unicycle fleet driven by the goal1 v/ω law, with collision checks."""
+
+    def __init__(self, starts, goals, controller=None, time_step=0.05, tolerance=5,
+                 collision_radius=5, cell_size=None):
+        starts = np.asarray(starts, dtype=float)
+        goals = np.asarray(goals, dtype=float)
+        self.x, self.y = starts[:, 0].copy(), starts[:, 1].copy()
+        self.heading = starts[:, 2].copy() if starts.shape[1] > 2 else np.zeros(len(starts))
+        self.goal_x, self.goal_y = goals[:, 0], goals[:, 1]
+
+        self.controller = controller or BatchGoalController(len(starts))
+        self.time_step = time_step
+        self.tolerance = tolerance
+        self.collision_radius = collision_radius
+        self.index = SpatialGrid(cell_size or collision_radius)
+
+        self.time = 0
+        self.steps = 0
+        self.active = np.ones(len(starts), dtype=bool)
+        self.arrival_time = np.full(len(starts), np.inf)
+        self.collisions = 0  # Pairs closer than collision_radius, summed over ticks
+
+    def __len__(self):
+        return len(self.x)
+
+    def errors(self):
+        """Return (distance_error, angle_error) arrays for every agent."""
+        return goal_errors_batch(self.x, self.y, self.heading, self.goal_x, self.goal_y)
+
+    def step(self):
+        """Advance every active agent one tick; return the number still active."""
+        distance_error, angle_error = self.errors()
+        arrived = self.active & (distance_error < self.tolerance)
+        self.arrival_time[arrived] = self.time
+        self.active &= ~arrived
+        if not self.active.any():
+            return 0
+
+        dt = self.time_step
+        v, ω = self.controller.compute(distance_error, dt, angle_error)
+
+        # **Prioritize Rotation if Facing Away from Goal**
+        v = prioritize_rotation(v, angle_error)
+        v[~self.active] = 0
+        ω[~self.active] = 0
+
+        self.heading = (self.heading + ω) % 360
+        rad = np.radians(self.heading)
+        self.x += v * np.cos(rad)
+        self.y += v * np.sin(rad)
+
+        # Collision query through the spatial index (only moving agents count)
+        i, j = self.index.build(self.x, self.y).pairs_within(self.collision_radius)
+        self.collisions += int(np.count_nonzero(self.active[i] | self.active[j]))
+
+        self.time += dt
+        self.steps += 1
+        return int(self.active.sum())
+
+    def neighbours(self, agent, radius=None):
+        """Indices of agents within ``radius`` of ``agent`` (from the last tick's index)."""
+        radius = radius or self.collision_radius
+        found = self.index.neighbours(self.x[agent], self.y[agent], radius)
+        return found[found != agent]
+
+    def run(self, max_steps=10000):
+        """Step until every agent arrives (or ``max_steps``) and return a FleetResult."""
+        self.index.build(self.x, self.y)
+        while self.steps < max_steps and self.step():
+            pass
+        return FleetResult(~self.active, self.arrival_time, self.x, self.y, self.heading,
+                           self.collisions, self.steps)
+
+
+def random_fleet(count, seed=0, half_canvas=200):
+    """Seeded random start poses and goals on the canvas."""
+    rng = np.random.default_rng(seed)
+    starts = np.column_stack((rng.uniform(-half_canvas, half_canvas, (count, 2)), rng.uniform(0, 360, count)))
+    goals = rng.uniform(-half_canvas, half_canvas, (count, 2))
+    return starts, goals
+
+
+def _run_shard(args):
+    starts, goals, kwargs, max_steps = args
+    return FleetSimulation(starts, goals, **kwargs).run(max_steps)
+
+
+def run_sharded(starts, goals, shards=None, workers=None, max_steps=10000, **kwargs):
+    """Split the fleet into shards simulated in worker processes and merge the results.
+
+    Collisions are only checked between agents of the same shard.
+    """
+    starts, goals = np.asarray(starts, dtype=float), np.asarray(goals, dtype=float)  # Lists index like arrays
+    shards = shards or workers or 1
+    parts = np.array_split(np.arange(len(starts)), shards)
+    tasks = [(starts[p], goals[p], kwargs, max_steps) for p in parts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_run_shard, tasks))
+
+    merged = [np.concatenate([getattr(r, field) for r in results])
+              for field in ("reached", "arrival_time", "x", "y", "heading")]
+    return FleetResult(*merged, sum(r.collisions for r in results), max(r.steps for r in results))
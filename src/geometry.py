@@ -0,0 +1,46 @@
+import math
+
+# Per-tick geometry for the navigation loops. The scalar functions use the
+# math module, which is far cheaper than NumPy for single values; the
+# *_batch twins take arrays (one element per agent) and import NumPy lazily
+# so the scalar path stays dependency-free. Angles are in degrees with the
+# turtle convention (0 = east, counterclockwise positive).
+
+
+def distance(x, y, goal_x, goal_y):
+    """Euclidean distance from (x, y) to the goal."""
+    return math.hypot(goal_x - x, goal_y - y)
+
+
+def bearing(dx, dy):
+    """Heading in degrees of the vector (dx, dy)."""
+    return math.degrees(math.atan2(dy, dx))
+
+
+def wrap_angle(angle):
+    """Wrap an angle in degrees to [-180, 180)."""
+    return (angle + 180) % 360 - 180
+
+
+def goal_errors(x, y, heading, goal_x, goal_y):
+    """Return (distance_error, angle_error) of a pose relative to the goal."""
+    dx = goal_x - x
+    dy = goal_y - y
+    return math.hypot(dx, dy), wrap_angle(bearing(dx, dy) - heading)
+
+
+def distance_batch(x, y, goal_x, goal_y):
+    """Element-wise distance for arrays of positions and/or goals."""
+    import numpy as np
+    return np.hypot(goal_x - x, goal_y - y)
+
+
+def bearing_batch(dx, dy):
+    """Element-wise heading in degrees of the vectors (dx, dy)."""
+    import numpy as np
+    return np.degrees(np.arctan2(dy, dx))
+
+
+def goal_errors_batch(x, y, heading, goal_x, goal_y):
+    """Element-wise (distance_error, angle_error) for arrays of poses."""
+    return distance_batch(x, y, goal_x, goal_y), wrap_angle(bearing_batch(goal_x - x, goal_y - y) - heading)
@@ -1,8 +1,14 @@
+import math
 import turtle
-import numpy as np
-import random
 import time
-from visualization import Visualization
+from controllers import GoalController
+from geometry import bearing, distance, goal_errors
+from instrumentation import InputLatency, profiler
+from simulation import GoalSimulation, MissionSimulation, SimulatedClock, random_spawn
+from scheduler import RateScheduler, TimerLoop
+from rendering import LONG_RUN_TRAIL, TurtleRenderer, PlotObserver
+from telemetry import TelemetryRecorder
+from visualization import LONG_RUN_HISTORY, Visualization
 
 class Navigation:
     """Base class for all navigation modes."""
@@ -37,23 +43,7 @@ class Navigation:
 
     def spawn_turtle(self):
         """Spawn turtle in an opposite quadrant at least 200 pixels from the goal."""
-        half_canvas = 400 // 2  # 200
-        min_distance = 200
-        margin = 50
-
-        spawn_zones = [
-            (-half_canvas + margin, half_canvas - margin),   # Top-left (-200, 200)
-            (-half_canvas + margin, -half_canvas + margin),  # Bottom-left (-200, -200)
-            (half_canvas - margin, -half_canvas + margin)    # Bottom-right (200, -200)
-        ]
-
-        valid_spawns = [
-            (random.randint(x, x + 100), random.randint(y, y + 100))
-            for x, y in spawn_zones
-            if abs(self.goal_x - x) >= min_distance and abs(self.goal_y - y) >= min_distance
-        ]
-
-        start_x, start_y = random.choice(valid_spawns)
+        start_x, start_y = random_spawn(self.goal_x, self.goal_y)
         self.turtle.penup()
         self.turtle.goto(start_x, start_y)
         self.turtle.pendown()
@@ -75,14 +65,27 @@ class Navigation:
         time.sleep(1)
         self.screen.bye()  # Closes the turtle graphics window
 
+# The interactive laws move the turtle per 0.05 s tick; ticks of other lengths scale them
+NOMINAL_TICK = 0.05
+
+
 class ManualNavigation(Navigation):
-    """Manual control using arrow keys."""
+    """Manual control using arrow keys.
+
+    The control loop runs on Tk timers (see scheduler.TimerLoop) at ``rate``
+    Hz, so key events are handled between ticks, and a key press or release
+    runs a tick at once instead of waiting for the next one.
+    """
 
-    def __init__(self):
+    def __init__(self, rate=20):
         super().__init__()
+        self.rate = rate
+        self.loop = None
+        self.latency = InputLatency()  # Key press/release to actuation
         self.key_states = {"Up": False, "Down": False, "Left": False, "Right": False}
         self.bind_keys()
         self.run()
+        self.screen.mainloop()
 
     def bind_keys(self):
         """Bind key events for movement."""
@@ -92,38 +95,46 @@ class ManualNavigation(Navigation):
             self.screen.onkeyrelease(lambda k=key: self.set_key_state(k, False), key)
 
     def set_key_state(self, key, state):
-        """Update key press state."""
+        """Update key press state, and act on a change right away."""
+        if self.key_states[key] == state:
+            return  # Auto-repeat
         self.key_states[key] = state
+        if self.loop and self.loop.running:
+            self.latency.pressed()
+            self.loop.kick()
 
     def run(self):
-        """Move turtle based on key presses."""
-        speed = 5
-
-        while True:
-            dx, dy = 0, 0
-            if self.key_states["Up"]: dy += speed
-            if self.key_states["Down"]: dy -= speed
-            if self.key_states["Left"]: dx -= speed
-            if self.key_states["Right"]: dx += speed
-
-            if dx or dy:
-                angle = np.degrees(np.arctan2(dy, dx))
-                self.turtle.setheading(angle)
-                self.turtle.forward(np.sqrt(dx**2 + dy**2))
-
-            if self.reached_goal():
-                print("Goal Reached!")
-                break
-
-            self.screen.update()
-            time.sleep(0.05)
+        """Start moving the turtle by the held keys on the Tk event loop."""
+        self.loop = TimerLoop(self.screen.ontimer, self.rate, self.step)
+        self.loop.start()
+
+    def step(self, dt):
+        """One tick: move by the held keys; return False once the goal is reached."""
+        speed = 5 * dt / NOMINAL_TICK
+        dx, dy = 0, 0
+        if self.key_states["Up"]: dy += speed
+        if self.key_states["Down"]: dy -= speed
+        if self.key_states["Left"]: dx -= speed
+        if self.key_states["Right"]: dx += speed
+
+        if dx or dy:
+            angle = bearing(dx, dy)
+            self.turtle.setheading(angle)
+            self.turtle.forward(math.hypot(dx, dy))
+        self.latency.actuated()
+
+        if self.reached_goal():
+            print("Goal Reached!")
+            print("Control loop:", self.loop.scheduler.summary())
+            print("Key to actuation:", self.latency.summary())
+            return False
 
-        self.screen.mainloop()
+        self.screen.update()
 
     def reached_goal(self):
         """Check if the turtle has reached the goal."""
         x, y = self.turtle.position()
-        if np.linalg.norm([self.goal_x - x, self.goal_y - y]) < 5:
+        if distance(x, y, self.goal_x, self.goal_y) < 5:
             print("Goal Reached!")
             self.close_screen()
             return True
@@ -132,10 +143,24 @@ class ManualNavigation(Navigation):
 class PIDNavigation(Navigation):
     """PID control to move the turtle to the goal."""
 
-    def __init__(self,  Kp=0.2, Ki=0.5, Kd=0):
+    def __init__(self,  Kp=0.2, Ki=0.5, Kd=0, Kv=0.8, Kω=0.1, Kω2=0.05, telemetry=None, plot="inline", realtime=True,
+                 long_run=False, controller="pid"):
         super().__init__( Kp, Ki, Kd)
+        self.telemetry = telemetry  # Optional path to record every tick to (see telemetry.py)
+        self.realtime = realtime  # False: simulated clock, as fast as the display allows
+        self.long_run = long_run  # Bounded trail, no undo buffer, fixed-size plot history
+        history = LONG_RUN_HISTORY if long_run else None
         self.start_button = turtle.Turtle()
-        self.visualizer = Visualization([], [], [])
+        if controller == "mpc":  # Sampling model-predictive control (see mpc.py)
+            from mpc import MPCController
+            self.controller = MPCController(goal=(self.goal_x, self.goal_y))
+        else:
+            self.controller = GoalController(Kv=Kv, Kω=Kω, Kω2=Kω2)  # v/ω gains (see tuning.py)
+        if plot == "process":  # Plot in a separate process (see dashboard.py)
+            from dashboard import ProcessVisualization
+            self.visualizer = ProcessVisualization(fields=("error", "velocity"), history=history)
+        else:
+            self.visualizer = Visualization(history=history)
         # self.start_time = None
 
         self.setup_start_button()
@@ -155,37 +180,38 @@ class PIDNavigation(Navigation):
         self.start_time = time.time()
         self.move_to_goal_pid()
     
+    def make_engine(self, **kwargs):
+        """Headless engine driving the turtle (see simulation.py)."""
+        return GoalSimulation(goal=(self.goal_x, self.goal_y), **kwargs)
+
     def move_to_goal_pid(self):
         """Move the turtle to the goal using adaptive velocity control."""
-        while True:
-            x, y = self.turtle.position()
-            goal_angle = np.degrees(np.arctan2(self.goal_y - y, self.goal_x - x))
-            current_angle = self.turtle.heading()
-            angle_error = (goal_angle - current_angle + 180) % 360 - 180
-
-            distance_error = np.linalg.norm([self.goal_x - x, self.goal_y - y])
-            time_elapsed = time.time() - self.start_time
-
-            if distance_error < 5:
-                print("Goal Reached!")
-                self.close_screen()
-                break
-
-            dt = time.time() - self.start_time
-            v, ω = self.compute_pid(distance_error, dt, angle_error)
-
-            # **Prioritize Rotation if Facing Away from Goal**
-            if abs(angle_error) > 30:
-                v *= 0.5  # Reduce forward speed if heading is very wrong
-
-            # **Apply Controls**
-            self.turtle.left(ω)
-            self.turtle.forward(v)
-
-            self.visualizer.update(time_elapsed, distance_error, v)
-            self.screen.update()
-            time.sleep(0.05)
-
+        x, y = self.turtle.position()
+        self.scheduler = RateScheduler(20) if self.realtime else None  # 0.05 s ticks, dt measured per tick
+        renderer = TurtleRenderer(self.turtle, self.screen, max_trail=LONG_RUN_TRAIL if self.long_run else None)
+        engine = self.make_engine(
+            controller=self.controller,
+            start=(x, y, self.turtle.heading()), clock=self.scheduler or SimulatedClock(0.05), record=False,
+            observers=[renderer,
+                       PlotObserver(self.visualizer, fields=("error", "velocity"))],
+        )
+        recorder = TelemetryRecorder(self.telemetry) if self.telemetry else None
+        if recorder:
+            engine.add_observer(recorder)
+        try:
+            engine.run()
+            renderer.flush()
+        finally:  # Keep what was recorded even if the window is closed mid-run
+            if recorder:
+                recorder.close()
+        if self.scheduler:
+            print("Control loop:", self.scheduler.summary())
+        if hasattr(self.controller, "summary"):
+            print("MPC plans:", self.controller.summary())
+
+        if engine.reached:
+            print("Goal Reached!")
+            self.close_screen()
         self.visualizer.show()
 
 
@@ -196,7 +222,7 @@ class PIDNavigation(Navigation):
         
         while True:
             x, y = self.turtle.position()
-            error = np.linalg.norm([self.goal_x - x, self.goal_y - y])
+            error = distance(x, y, self.goal_x, self.goal_y)
             time_elapsed = time.time() - self.start_time
             
 
@@ -218,23 +244,7 @@ class PIDNavigation(Navigation):
 
     def compute_pid(self, distance_error, dt, angle_error):
         """Compute linear velocity (v) and angular velocity (ω) dynamically."""
-        self.integral += distance_error * dt
-        derivative = (distance_error - self.prev_error) / dt if dt > 0 else 0
-
-        # **Dynamic Linear Velocity (v) based on distance and ω**
-        Kv = 0.8  # Adjust for faster acceleration
-        v = Kv * distance_error * (1 / (1 + abs(angle_error) / 30))  # Reduce v if angle error is large
-
-        # **Dynamic Angular Velocity (ω) based on angle error**
-        Kω = 0.1  # Base correction
-        Kω2 = 0.05  # Extra term to ensure ω is strong when v is high
-        ω = Kω * angle_error + Kω2 * (angle_error / (1 + abs(v)))
-
-        # **Limit ω to avoid extreme turning**
-        ω = max(min(ω, 20), -20)  
-
-        self.prev_error = distance_error
-        return v, ω
+        return self.controller.compute(distance_error, dt, angle_error)
 
 
 
@@ -246,17 +256,67 @@ class PIDNavigation(Navigation):
         self.prev_error = error
         return min(output, self.max_speed)
 
+class MissionNavigation(PIDNavigation):
+    """Visit many waypoints in one continuous run with the goal1 v/ω controller.
+
+    The route is planned from the turtle's pose when the run starts
+    (nearest neighbour plus 2-opt, see routing.py), or kept in input order
+    with ``order="input"``.
+    """
+
+    def __init__(self, waypoints, order="planned", **kwargs):
+        self.waypoints = list(waypoints)
+        self.order = order
+        super().__init__(**kwargs)
+
+    def draw_goal_marker(self):
+        """Dot every waypoint, drawn in one screen update."""
+        marker = turtle.Turtle()
+        marker.hideturtle()
+        marker.penup()
+        tracer = self.screen.tracer()
+        self.screen.tracer(0)
+        for x, y in self.waypoints:
+            marker.goto(x, y)
+            marker.dot(4, "red")
+        self.screen.update()
+        self.screen.tracer(tracer)
+
+    def make_engine(self, **kwargs):
+        """Order the waypoints from the start pose (kept in ``route``) and return the mission engine."""
+        from routing import plan_route, route_length
+        x, y, _ = kwargs["start"]
+        start = time.perf_counter()
+        if self.order == "planned":
+            self.route = plan_route(self.waypoints, (x, y))
+        else:
+            self.route = list(range(len(self.waypoints)))
+        self.planning_time = time.perf_counter() - start
+        self.route_length = route_length(self.waypoints, self.route, (x, y))
+        return MissionSimulation([self.waypoints[i] for i in self.route], **kwargs)
+
+    def move_to_goal_pid(self):
+        """Fly the mission, then report the route with the run's other summaries."""
+        super().move_to_goal_pid()
+        print(f"Route: {len(self.route)} waypoints, {self.route_length:.0f} px "
+              f"({self.order} order, planned in {self.planning_time:.3f} s)")
+
+
 class PIDManualNavigation(PIDNavigation, ManualNavigation):
     """PID control with manual interference."""
-    def __init__(self):
-        PIDNavigation.__init__(self)
-        # ManualNavigation.__init__(self)
+    def __init__(self, rate=20, Kv=0.8, Kω=0.1, Kω2=0.05):
+        self.rate = rate
+        self.loop = None
+        self.latency = InputLatency()  # Key press/release to actuation
         self.key_states = {"Up": False, "Down": False, "Left": False, "Right": False}
+        PIDNavigation.__init__(self, Kv=Kv, Kω=Kω, Kω2=Kω2)  # Runs the window until it is closed
+        # ManualNavigation.__init__(self)
+
+    def setup_start_button(self):
+        """Called by PIDNavigation.__init__ before its main loop: bind the keys and this mode's button."""
         self.bind_keys()
-        
         # self.start_time = None
         self.setup_start_button2()  # Ensure start button is set up properly
-        self.screen.mainloop()
 
     def setup_start_button2(self):
         """Override start button to ensure it calls start_pid from this class."""
@@ -286,7 +346,7 @@ class PIDManualNavigation(PIDNavigation, ManualNavigation):
 
         while True:
             x, y = self.turtle.position()
-            error = np.linalg.norm([self.goal_x - x, self.goal_y - y])
+            error = distance(x, y, self.goal_x, self.goal_y)
             time_elapsed = time.time() - self.start_time
 
             if error < 5:
@@ -310,11 +370,11 @@ class PIDManualNavigation(PIDNavigation, ManualNavigation):
             if self.key_states["Right"]: dx += 5
 
             if dx != 0 or dy != 0:
-                angle = np.degrees(np.arctan2(dy, dx))
+                angle = bearing(dx, dy)
                 self.turtle.setheading(angle)
-                self.turtle.forward(np.sqrt(dx**2 + dy**2))
+                self.turtle.forward(math.hypot(dx, dy))
             
-            actual_speed = min(pid_speed, np.sqrt(dx**2 + dy**2))
+            actual_speed = min(pid_speed, math.hypot(dx, dy))
             visualizer2.update(time_elapsed, error, actual_speed)
 
             self.screen.update()
@@ -328,53 +388,63 @@ class PIDManualNavigation(PIDNavigation, ManualNavigation):
     def run(self):
         """Move turtle using combined PID control and manual angular control."""
         self.start_time = time.time()
-        visualizer2 = Visualization([], [], [])
-
-        while True:
-            x, y = self.turtle.position()
-            goal_angle = np.degrees(np.arctan2(self.goal_y - y, self.goal_x - x))
-            current_angle = self.turtle.heading()
-            angle_error = (goal_angle - current_angle + 180) % 360 - 180
-
-            error = np.linalg.norm([self.goal_x - x, self.goal_y - y])
-            time_elapsed = time.time() - self.start_time
-
-            if error < 5:
-                print("Goal Reached!")
-                self.close_screen()
-                break
-
-            dt = time.time() - self.start_time
-            pid_v, pid_ω = self.compute_pid(error, dt, angle_error)
-
-            # Manual control for angular velocity (ω)
-            manual_ω = 0
-            if self.key_states["Left"]: 
-                manual_ω -= 3  # Rotate counterclockwise
-            if self.key_states["Right"]: 
-                manual_ω += 3  # Rotate clockwise
-
-            ω = pid_ω + manual_ω  # Combine PID and manual control
-            ω = max(min(ω, 10), -10)  # Limit rotation speed
-
-            # Manual control for linear velocity (v)
-            manual_v = 0
-            if self.key_states["Up"]: 
-                manual_v += 2
-            if self.key_states["Down"]: 
-                manual_v -= 2
-
-            v = pid_v + manual_v
-            v = min(v, self.max_speed)  # Cap max speed
-
-            # Apply control
-            self.turtle.left(ω)
-            self.turtle.forward(v)
-
-            visualizer2.update(time_elapsed, error, v)
-            self.screen.update()
-            time.sleep(0.05)
+        self.visualizer2 = Visualization()
+        self.loop = TimerLoop(self.screen.ontimer, self.rate, self.step)  # dt measured per tick
+        self.scheduler = self.loop.scheduler
+        self.loop.start()
+
+    def step(self, dt):
+        """One tick of PID plus the held keys; return False once the goal is reached."""
+        timer = profiler.tick()
+        x, y = self.turtle.position()
+        error, angle_error = goal_errors(x, y, self.turtle.heading(), self.goal_x, self.goal_y)
+        time_elapsed = time.time() - self.start_time
+        timer.mark("sense")
 
-        visualizer2.show()
+        if error < 5:
+            print("Goal Reached!")
+            self.close_screen()
+            print("Control loop:", self.scheduler.summary())
+            print("Key to actuation:", self.latency.summary())
+            self.visualizer2.show()
+            return False
+
+        pid_v, pid_ω = self.compute_pid(error, dt, angle_error)
+
+        # Manual control for angular velocity (ω)
+        manual_ω = 0
+        if self.key_states["Left"]: 
+            manual_ω -= 3  # Rotate counterclockwise
+        if self.key_states["Right"]: 
+            manual_ω += 3  # Rotate clockwise
+
+        ω = pid_ω + manual_ω  # Combine PID and manual control
+        ω = max(min(ω, 10), -10)  # Limit rotation speed
+
+        # Manual control for linear velocity (v)
+        manual_v = 0
+        if self.key_states["Up"]: 
+            manual_v += 2
+        if self.key_states["Down"]: 
+            manual_v -= 2
+
+        v = pid_v + manual_v
+        v = min(v, self.max_speed)  # Cap max speed
+
+        # Per-tick commands, tuned for 0.05 s ticks; never more than one nominal tick's worth,
+        # since the proportional v would overshoot the goal
+        scale = min(dt / NOMINAL_TICK, 1.0)
+        timer.mark("control")
+
+        # Apply control
+        self.turtle.left(ω * scale)
+        self.turtle.forward(v * scale)
+        self.latency.actuated()
+        timer.mark("actuate")
+
+        self.visualizer2.update(time_elapsed, error, v)
+        timer.mark("plot")
+        self.screen.update()
+        timer.mark("render")
 
 
@@ -1,45 +1,29 @@
 import turtle
-import time
-from visualization import Visualization
-
-class PIDController:
-    """PID Controller with gradual acceleration transitions."""
-    def __init__(self, kp, ki, kd, min_output, max_output, accel_rate=2.0):
-        self.kp = kp  # Proportional Gain
-        self.ki = ki  # Integral Gain
-        self.kd = kd  # Derivative Gain
-        self.min_output = min_output  # Lower bound (for deceleration)
-        self.max_output = max_output  # Upper bound (for acceleration)
-        self.accel_rate = accel_rate  # Maximum rate of change of acceleration (px/s³)
-        self.prev_error = 0
-        self.integral = 0
-        self.current_acceleration = 0  # Smoothly controlled acceleration
-
-    def compute(self, target, current, dt):
-        """Compute the PID output with smooth acceleration changes."""
-        error = target - current
-        self.integral += error * dt
-        derivative = (error - self.prev_error) / dt if dt > 0 else 0
-        self.prev_error = error
-
-        # Compute desired acceleration from PID
-        desired_acceleration = self.kp * error + self.ki * self.integral + self.kd * derivative
-
-        # Gradually adjust acceleration within the allowed rate of change
-        if desired_acceleration > self.current_acceleration:
-            self.current_acceleration += min(self.accel_rate * dt, desired_acceleration - self.current_acceleration)
-        else:
-            self.current_acceleration -= min(self.accel_rate * dt, self.current_acceleration - desired_acceleration)
-
-        # Clamp final acceleration within bounds
-        self.current_acceleration = max(self.min_output, min(self.current_acceleration, self.max_output))
-
-        return self.current_acceleration
-
+from controllers import PIDController
+from simulation import GridSimulation, SimulatedClock
+from scheduler import RateScheduler
+from telemetry import TelemetryRecorder
+from rendering import LONG_RUN_TRAIL, TurtleRenderer, PlotObserver
+from visualization import LONG_RUN_HISTORY, Visualization
 
 class GridNavigation:
-    def __init__(self):
-        """Initialize the turtle and PID controllers."""
+    def __init__(self, kp=2.0, ki=0.1, kd=0.5, telemetry=None, motion="pid", plot="inline", realtime=True,
+                 long_run=False, pattern=None):
+        """Initialize the turtle and PID controllers (velocity gains from tuning.py).
+
+        ``telemetry`` is an optional path to record every tick to (see telemetry.py).
+        ``motion="profile"`` plays cached S-curve profiles instead of stepping the PID.
+        ``plot="process"`` draws the plots in a separate process (see dashboard.py).
+        ``realtime=False`` runs on the simulated clock, as fast as the display allows.
+        ``long_run=True`` keeps memory flat over many laps: bounded trail, no undo
+        buffer and a fixed-size plot history.
+        ``pattern=(rows, cols)`` sweeps a coverage pattern instead of the 4x4 grid;
+        ``motion="compiled"`` drives the mission as one continuous plan (see paths.py).
+        ``motion="adaptive"`` is headless only (see GridSimulation) and is rejected here:
+        it integrates a whole segment at once, so the turtle would jump instead of moving.
+        """
+        if motion == "adaptive":
+            raise ValueError("motion='adaptive' is headless only; use GridSimulation or main.py headless-grid")
         self.turtle = turtle.Turtle()
         self.turtle.shape("turtle")
         self.turtle.color("black")
@@ -50,77 +34,77 @@ class GridNavigation:
         self.time_elapsed = 0  # Cumulative time tracker
 
         # PID Controllers with acceleration limits
-        self.velocity_pid = PIDController(kp=2.0, ki=0.1, kd=0.5, min_output=-3, max_output=15)
+        self.velocity_pid = PIDController(kp=kp, ki=ki, kd=kd, min_output=-3, max_output=15)
         self.angular_pid = PIDController(kp=1.5, ki=0.05, kd=0.3, min_output=-10, max_output=10)  # Adjusted for smooth turning
 
         # Real-time visualization
-        self.visualization = Visualization()
+        if plot == "process":
+            from dashboard import ProcessVisualization
+            self.visualization = ProcessVisualization(history=LONG_RUN_HISTORY if long_run else None)
+        else:
+            self.visualization = Visualization(history=LONG_RUN_HISTORY if long_run else None)
+
+        # Headless engine steps the physics; the turtle and the plots observe it
+        self.scheduler = RateScheduler(10) if realtime else None  # 0.1 s ticks, dt measured per tick
+        self.renderer = TurtleRenderer(self.turtle, max_trail=LONG_RUN_TRAIL if long_run else None)
+        self.engine = GridSimulation(
+            velocity_pid=self.velocity_pid, angular_pid=self.angular_pid,
+            grid_size=self.grid_size, grid_steps=self.grid_steps, motion=motion, pattern=pattern,
+            clock=self.scheduler or SimulatedClock(0.1), record=False,
+            observers=[self.renderer, PlotObserver(self.visualization, modes=("move",))],
+        )
+        self.recorder = TelemetryRecorder(telemetry) if telemetry else None
+        if self.recorder:
+            self.engine.add_observer(self.recorder)
 
     def move_with_pid(self, distance):
         """Move forward using PID control with limited acceleration and deceleration."""
-        time_step = 0.1
-        traveled = 0
-        velocity = 0
-        prev_velocity = 0
-
-        while traveled < distance:
-            # PID-controlled acceleration with limits (-3 to 15)
-            acceleration = self.velocity_pid.compute(distance - traveled, velocity, time_step)
-            velocity += acceleration * time_step
-
-            step = velocity * time_step
-            self.turtle.forward(step)
-            traveled += step
-
-            # Compute actual acceleration for visualization
-            actual_acceleration = (velocity - prev_velocity) / time_step
-            self.visualization.update(self.time_elapsed, velocity, actual_acceleration)
-
-            # Update time and previous velocity
-            self.time_elapsed += time_step
-            prev_velocity = velocity
-            time.sleep(time_step)
-
-        self.turtle.forward(distance - traveled)  # Ensure exact stopping
+        self.engine.move(distance)
+        self.time_elapsed = self.engine.time
 
     def turn_with_pid(self, angle):
         """Turn with controlled angular velocity."""
-        time_step = 0.1
-        rotated = 0
-        angular_velocity = 0
-        prev_angular_velocity = 0
-
-        while abs(rotated) < abs(angle):
-            # PID-controlled angular acceleration
-            angular_acceleration = self.angular_pid.compute(angle - rotated, angular_velocity, time_step)
-            angular_velocity += angular_acceleration * time_step
-
-            turn_step = angular_velocity * time_step
-            self.turtle.left(turn_step)
-            rotated += turn_step
-
-            # Update time
-            self.time_elapsed += time_step
-            time.sleep(time_step)
-
-        self.turtle.left(angle - rotated)  # Ensure exact rotation
-
-    def draw_grid(self):
-        """Make the turtle draw a 4x4 grid while following the path closely."""
-        for _ in range(self.grid_steps):
-            for _ in range(self.grid_steps):
-                self.move_with_pid(self.grid_size)  # Move forward
-            self.turn_with_pid(90)  # Turn left
-            self.move_with_pid(self.grid_size)  # Move to next row
-            self.turn_with_pid(90)
+        self.engine.turn(angle)
+        self.time_elapsed = self.engine.time
+
+    def draw_grid(self, laps=1):
+        """Make the turtle draw a 4x4 grid while following the path closely.
+
+        The grid is drawn ``laps`` times, or until the window is closed when 0.
+        """
+        engine = self.engine
+        # Waypoint missions are laid out once: every lap drives back to the start and repeats the first
+        waypoints = engine.waypoints() if engine.pattern or engine.motion == "compiled" else None
+        lap = 0
+        try:
+            while not laps or lap < laps:
+                if waypoints:
+                    engine.run_waypoints(waypoints)
+                    self.time_elapsed = engine.time
+                else:
+                    for _ in range(self.grid_steps):
+                        for _ in range(self.grid_steps):
+                            self.move_with_pid(self.grid_size)  # Move forward
+                        self.turn_with_pid(90)  # Turn left
+                        self.move_with_pid(self.grid_size)  # Move to next row
+                        self.turn_with_pid(90)
+                lap += 1
+            self.renderer.flush()
+        except turtle.Terminator:
+            pass  # Window closed
+        finally:
+            if self.recorder:
+                self.recorder.close()
 
         print("Grid Drawing Completed!")
+        if self.scheduler:
+            print("Control loop:", self.scheduler.summary())
         self.visualization.show()  # Show final visualization
 
-    def start(self):
+    def start(self, laps=1):
         """Start grid drawing mode."""
         print("Starting Grid Drawing with PID Control...")
-        self.draw_grid()
+        self.draw_grid(laps)
 
 
 # Run the navigation
@@ -0,0 +1,184 @@
+import atexit
+import json
+import os
+import sys
+import time
+
+# Latency histograms use power-of-two nanosecond buckets: bucket b holds
+# durations in [2**(b-1), 2**b) ns, so 64 buckets cover any duration
+BUCKETS = 64
+
+
+class PhaseStats:
+    """Counter, total, extremes and latency histogram of one phase."""
+
+    __slots__ = ("count", "total", "min", "max", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.histogram = [0] * BUCKETS
+
+    def record(self, ns):
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.histogram[min(ns.bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        """Upper bound (ns) of the bucket holding the ``q``-th percentile."""
+        if not self.count:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket, n in enumerate(self.histogram):
+            seen += n
+            if seen >= rank and n:
+                return min(1 << bucket, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total / 1e6,
+            "mean_us": self.total / self.count / 1e3 if self.count else 0.0,
+            "min_us": (self.min or 0) / 1e3,
+            "p50_us": self.percentile(50) / 1e3,
+            "p90_us": self.percentile(90) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "max_us": self.max / 1e3,
+            "histogram": {f"<{1 << b}ns": n for b, n in enumerate(self.histogram) if n},
+        }
+
+
+class TickTimer:
+    """Times consecutive phases of one tick: each mark closes the phase since the last one."""
+
+    __slots__ = ("phases", "last")
+
+    def __init__(self, phases):
+        self.phases = phases
+        self.last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        now = time.perf_counter_ns()
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.record(now - self.last)
+        self.last = now
+
+
+class _NullTimer:
+    """Shared stand-in while profiling is off: marking costs one no-op call."""
+
+    __slots__ = ()
+
+    def mark(self, phase):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class InputLatency:
+    """Latency from operator input to the first actuation that includes it.
+
+    Input handlers call ``pressed()``; the control loop calls ``actuated()``
+    right after applying a command. Input arriving while an earlier one is
+    still waiting is measured from the earlier one.
+    """
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.stats = PhaseStats()
+        self.pending = None
+
+    def pressed(self):
+        if self.pending is None:
+            self.pending = self.clock()
+
+    def actuated(self):
+        if self.pending is not None:
+            self.stats.record(self.clock() - self.pending)
+            self.pending = None
+
+    def summary(self):
+        s = self.stats.summary()
+        if not s["count"]:
+            return "no input"
+        return (f"{s['count']} inputs, mean {s['mean_us'] / 1000:.1f} ms, p50 {s['p50_us'] / 1000:.1f} ms, "
+                f"p99 {s['p99_us'] / 1000:.1f} ms, max {s['max_us'] / 1000:.1f} ms")
+
+
+class Profiler:
+    """Per-tick phase profiler for the control loops.
+
+    Loops call ``timer = profiler.tick()`` at the top of every tick and
+    ``timer.mark(phase)`` as each phase (sleep, sense, control, actuate,
+    render, plot, ...) ends. Disabled, ``tick`` hands out a shared no-op
+    timer; the headless engines go further and read ``enabled`` once per
+    segment, skipping the marks, so leaving the hooks in costs about a
+    test per phase.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.ticks = 0
+        self.phases = {}
+        self._dump_registered = False
+
+    def enable(self, dump=None):
+        """Start collecting; with ``dump`` ("-" for stderr, or a JSON path) report at exit."""
+        self.enabled = True
+        if dump and not self._dump_registered:
+            atexit.register(self.dump, None if dump == "-" else dump)
+            self._dump_registered = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.ticks = 0
+        self.phases = {}
+
+    def tick(self):
+        if not self.enabled:
+            return NULL_TIMER
+        self.ticks += 1
+        return TickTimer(self.phases)
+
+    def stats(self):
+        """Per-phase counters and latency percentiles, slowest phase first."""
+        ordered = sorted(self.phases.items(), key=lambda item: -item[1].total)
+        return {"ticks": self.ticks, "phases": {name: stats.summary() for name, stats in ordered}}
+
+    def report(self):
+        stats = self.stats()
+        lines = [f"{stats['ticks']} profiled ticks",
+                 f"{'phase':<10}{'count':>9}{'total ms':>11}{'mean us':>10}"
+                 f"{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'max us':>11}"]
+        for name, s in stats["phases"].items():
+            lines.append(f"{name:<10}{s['count']:>9}{s['total_ms']:>11.2f}{s['mean_us']:>10.2f}"
+                         f"{s['p50_us']:>10.2f}{s['p90_us']:>10.2f}{s['p99_us']:>10.2f}{s['max_us']:>11.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path=None):
+        """Write the stats as JSON to ``path``, or the report to stderr."""
+        if path:
+            with open(path, "w") as f:
+                json.dump(self.stats(), f, indent=2)
+        else:
+            print(self.report(), file=sys.stderr)
+
+
+profiler = Profiler()
+
+# FLYT_PROFILE=1 (or a JSON path) profiles any run and reports at exit
+if os.environ.get("FLYT_PROFILE"):
+    profiler.enable("-" if os.environ["FLYT_PROFILE"] == "1" else os.environ["FLYT_PROFILE"])
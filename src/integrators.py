@@ -0,0 +1,205 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from controllers import goal_law, prioritize_rotation
+from geometry import distance, goal_errors
+
+# Dormand–Prince 5(4) tableau; the last stage is evaluated at the new point (FSAL)
+_C = (0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1)
+_A = tuple(np.array(row) for row in (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+))
+_B5 = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0])
+_B4 = np.array([5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40])
+_E = _B5 - _B4  # Embedded error weights
+
+AdaptiveResult = namedtuple("AdaptiveResult", ["t", "y", "event", "steps", "rejected"])
+
+
+class Event:
+    """Zero crossing of ``function(t, y)`` to locate during integration."""
+
+    def __init__(self, function, terminal=True, direction=0, name=None):
+        self.function = function
+        self.terminal = terminal
+        self.direction = direction  # +1 rising, -1 falling, 0 either
+        self.name = name or getattr(function, "__name__", "event")
+
+    def __call__(self, t, y):
+        return self.function(t, y)
+
+    def crossed(self, g0, g1):
+        if self.direction >= 0 and g0 < 0 <= g1:
+            return True
+        return self.direction <= 0 and g0 > 0 >= g1
+
+
+def _dp_step(f, t, y, h, k1):
+    """One Dormand–Prince step; return (y5, error estimate, stages)."""
+    k = np.empty((7, len(y)))
+    k[0] = k1
+    for i in range(1, 6):
+        k[i] = f(t + _C[i] * h, y + h * (_A[i] @ k[:i]))
+    y5 = y + h * (_B5[:6] @ k[:6])
+    k[6] = f(t + h, y5)
+    return y5, h * (_E @ k), k
+
+
+def _hermite(t0, y0, f0, t1, y1, f1, t):
+    """Cubic Hermite interpolation of the solution inside an accepted step."""
+    h = t1 - t0
+    s = (t - t0) / h
+    h00 = 2 * s ** 3 - 3 * s ** 2 + 1
+    h10 = s ** 3 - 2 * s ** 2 + s
+    h01 = -2 * s ** 3 + 3 * s ** 2
+    h11 = s ** 3 - s ** 2
+    return h00 * y0 + h10 * h * f0 + h01 * y1 + h11 * h * f1
+
+
+def _locate(event, f, t0, y0, f0, t1, y1, f1, g0, g1, tol):
+    """Find the event time in [t0, t1] (Illinois false position), then land on it exactly."""
+    a, b, ga, gb = t0, t1, g0, g1
+    side = 0
+    for _ in range(60):
+        t = b - gb * (b - a) / (gb - ga) if gb != ga else (a + b) / 2
+        g = event(t, _hermite(t0, y0, f0, t1, y1, f1, t))
+        if abs(b - a) < tol or g == 0:
+            break
+        if (g > 0) == (gb > 0):
+            b, gb = t, g
+            if side == -1:
+                ga /= 2
+            side = -1
+        else:
+            a, ga = t, g
+            if side == 1:
+                gb /= 2
+            side = 1
+    # Refine with secant steps on exact integrations from the step start,
+    # so the stopping point does not inherit the interpolation error
+    exact = lambda t: _dp_step(f, t0, y0, t - t0, f0)[0]
+    t_prev, g_prev = t1, g1
+    y = exact(t)
+    g = event(t, y)
+    for _ in range(8):
+        if abs(g) < 1e-12 or g == g_prev:
+            break
+        t, t_prev, g_prev = t - g * (t - t_prev) / (g - g_prev), t, g
+        t = min(max(t, t0), t1)
+        y = exact(t)
+        g = event(t, y)
+        if abs(t - t_prev) < tol:
+            break
+    return t, y
+
+
+def integrate(f, t0, y0, t_max, events=(), rtol=1e-4, atol=1e-6, h0=0.1, h_max=math.inf,
+              event_tol=1e-10, max_steps=100000):
+    """Integrate y' = f(t, y) with adaptive Dormand–Prince steps.
+
+    Steps grow while the local error estimate allows and shrink near fast
+    dynamics. Events are checked after every accepted step and located by
+    root finding; integration stops exactly on the first terminal event.
+    """
+    t = t0
+    y = np.asarray(y0, dtype=float)
+    k1 = f(t, y)
+    h = min(h0, h_max)
+    ts, ys = [t], [y]
+    g_prev = [event(t, y) for event in events]
+    steps = rejected = 0
+
+    while t < t_max and steps < max_steps:
+        h = min(h, t_max - t)
+        y_new, error, k = _dp_step(f, t, y, h, k1)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err = math.sqrt(np.mean((error / scale) ** 2))
+        if err > 1 and h > 1e-12:
+            rejected += 1
+            h *= max(0.2, 0.9 * err ** -0.2)
+            continue
+
+        steps += 1
+        t_new = t + h
+        f_new = k[-1]
+        for i, event in enumerate(events):
+            g_new = event(t_new, y_new)
+            if event.crossed(g_prev[i], g_new) and event.terminal:
+                t_event, y_event = _locate(event, f, t, y, k1, t_new, y_new, f_new,
+                                           g_prev[i], g_new, event_tol)
+                ts.append(t_event)
+                ys.append(y_event)
+                return AdaptiveResult(np.array(ts), np.array(ys), event.name, steps, rejected)
+            g_prev[i] = g_new
+
+        t, y, k1 = t_new, y_new, f_new
+        ts.append(t)
+        ys.append(y)
+        h = min(h_max, h * (min(5.0, 0.9 * err ** -0.2) if err > 0 else 5.0))
+
+    return AdaptiveResult(np.array(ts), np.array(ys), None, steps, rejected)
+
+
+def pid_axis_model(pid, target, slew_time=0.05):
+    """Continuous approximation of a PIDController driving one axis toward ``target``.
+
+    State is [position, velocity, acceleration, integral]. As in the discrete
+    loop the controller sees error = (target - position) - velocity, and the
+    acceleration moves toward the PID demand at most ``accel_rate`` per second,
+    within [min_output, max_output].
+
+    This is an approximation, not the discrete loop in the limit: once the
+    demand is within one tick's reach, the discrete PID jumps straight to
+    it, while here the acceleration follows it with a first-order lag of
+    ``slew_time`` seconds. The lag keeps the right-hand side continuous for
+    the adaptive stepper; adaptive results differ slightly from the
+    fixed-step ones for that reason, on top of the discretization.
+    """
+    def f(t, state):
+        position, velocity, acceleration, _ = state
+        error = target - position - velocity
+        error_rate = -velocity - acceleration
+        desired = pid.kp * error + pid.ki * state[3] + pid.kd * error_rate
+        jerk = min(max((desired - acceleration) / slew_time, -pid.accel_rate), pid.accel_rate)
+        if (acceleration >= pid.max_output and jerk > 0) or (acceleration <= pid.min_output and jerk < 0):
+            jerk = 0.0
+        return np.array([velocity, acceleration, jerk, error])
+    return f
+
+
+def arrival(target):
+    """Terminal event when the position reaches ``target``."""
+    return Event(lambda t, state: state[0] - target, direction=1 if target >= 0 else -1, name="arrival")
+
+
+def goal_model(controller, goal, tick):
+    """Continuous unicycle driven by the goal1 law; v/ω are per ``tick`` as in the live loop.
+
+    The law and the rotation priority are the ones GoalController and
+    GoalSimulation.step use, so both integrators always drive the same way.
+    """
+    goal_x, goal_y = goal
+
+    def f(t, state):
+        x, y, heading = state
+        distance_error, angle_error = goal_errors(x, y, heading, goal_x, goal_y)
+        v, ω = goal_law(distance_error, angle_error, controller.Kv, controller.Kω, controller.Kω2,
+                        controller.max_ω)
+        v = prioritize_rotation(v, angle_error)
+        rad = math.radians(heading)
+        return np.array([v * math.cos(rad) / tick, v * math.sin(rad) / tick, ω / tick])
+    return f
+
+
+def goal_reached(goal, tolerance):
+    """Terminal event when the distance to ``goal`` falls to ``tolerance``."""
+    goal_x, goal_y = goal
+    return Event(lambda t, state: distance(state[0], state[1], goal_x, goal_y) - tolerance,
+                 direction=-1, name="goal")
@@ -1,33 +1,225 @@
-import turtle
-from goal1 import ManualNavigation, PIDNavigation, PIDManualNavigation
-from goal2 import GridNavigation  # Import new independent grid navigation
+import argparse
+import sys
 
-def main():
+from cli import positive_int
+
+# Modules are imported inside each mode, so a run only pays for what it uses:
+# headless modes never load turtle/Tk or matplotlib.
+MODES = ["manual", "pid", "pid-manual", "grid", "mission", "headless-grid", "headless-goal", "headless-mission"]
+# Own CLIs, dispatched before parsing: only as the first argument, so they are not MODES
+TOOLS = {"tune": "tuning", "bench": "benchmark", "montecarlo": "montecarlo", "cache": "resultcache",
+         "analyze": "analysis"}
+MENU = {"1": "manual", "2": "pid", "3": "pid-manual", "4": "grid"}
+
+
+def grid_pattern(text):
+    """Parse a coverage pattern given as ROWSxCOLS, e.g. 16x16; both must be at least 1."""
+    try:
+        rows, cols = (int(n) for n in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ROWSxCOLS, got {text!r}")
+    if rows < 1 or cols < 1:
+        raise argparse.ArgumentTypeError(f"expected at least 1 row and 1 column, got {text!r}")
+    return rows, cols
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="FlytBase turtle PID navigation")
+    parser.add_argument("mode", nargs="?", choices=MODES,
+                        help="Mode to run (prompts interactively when omitted). The tools "
+                             "'tune', 'bench', 'montecarlo', 'cache' and 'analyze' must come first and take "
+                             "their own options, see 'main.py tune --help'")
+    parser.add_argument("--telemetry", help="Record every tick to this file (see telemetry.py)")
+    parser.add_argument("--plot", choices=["inline", "process"], default="inline",
+                        help="Draw live plots in the control loop or in a separate process (see dashboard.py)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Run the live pid/grid modes on the simulated clock, limited only by the display")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="JSON",
+                        help="Time every tick's phases and report at exit (to stderr, or as JSON to a file)")
+    parser.add_argument("--long-run", action="store_true",
+                        help="Bounded memory for soak tests: capped trail, no undo buffer, fixed-size plot history")
+    parser.add_argument("--rate", type=float, default=20,
+                        help="Control rate (Hz) of the manual modes; key presses act at once either way")
+
+    grid = parser.add_argument_group("grid modes")
+    grid.add_argument("--kp", type=float, default=2.0)
+    grid.add_argument("--ki", type=float, default=0.1)
+    grid.add_argument("--kd", type=float, default=0.5)
+    grid.add_argument("--motion", choices=["pid", "profile", "adaptive", "compiled"], default="pid",
+                      help="'adaptive' is for headless-grid only")
+    grid.add_argument("--grid-size", type=float, default=100)
+    grid.add_argument("--grid-steps", type=int, default=4)
+    grid.add_argument("--pattern", type=grid_pattern, metavar="ROWSxCOLS",
+                      help="Sweep a coverage pattern of this many grid-size cells instead of the 4x4 grid")
+    grid.add_argument("--laps", type=int, default=1, help="Times to draw the grid (0 = until the window is closed)")
+
+    goal = parser.add_argument_group("goal modes")
+    goal.add_argument("--kv", type=float, default=0.8, help="Kv")
+    goal.add_argument("--kw", type=float, default=0.1, help="Kω")
+    goal.add_argument("--kw2", type=float, default=0.05, help="Kω2")
+    goal.add_argument("--start", type=float, nargs=2, metavar=("X", "Y"),
+                      help="Headless start position (default: random spawn)")
+    goal.add_argument("--seed", type=int, help="Seed for the random spawn")
+    goal.add_argument("--integrator", choices=["fixed", "adaptive"], default="fixed")
+    goal.add_argument("--controller", choices=["pid", "mpc"], default="pid",
+                      help="The Kv/Kω heuristic or the sampling model-predictive controller (see mpc.py)")
+
+    mission = parser.add_argument_group("mission modes (goal options apply too)")
+    mission.add_argument("--waypoints", type=positive_int, default=200, help="Number of random waypoints (seeded by --seed)")
+    mission.add_argument("--order", choices=["planned", "input"], default="planned",
+                         help="Visit the waypoints in a planned route (see routing.py) or as generated")
+    return parser
+
+
+def run_headless_grid(args):
+    from controllers import PIDController
+    from simulation import GridSimulation
+
+    velocity_pid = PIDController(kp=args.kp, ki=args.ki, kd=args.kd, min_output=-3, max_output=15)
+    sim = GridSimulation(velocity_pid=velocity_pid, grid_size=args.grid_size, grid_steps=args.grid_steps,
+                         motion=args.motion, pattern=args.pattern, record=False)
+    _record(sim, args.telemetry, sim.run)
+    print(f"Grid mission {'completed' if not sim.stalled else 'stalled'}: "
+          f"{sim.time:.2f} s simulated, final pose ({sim.x:.2f}, {sim.y:.2f}, {sim.heading:.1f}°)")
+
+
+def run_headless_goal(args):
+    import random
+    from controllers import GoalController
+    from simulation import GoalSimulation, random_spawn
+
+    goal = (300, 300)
+    start = args.start or random_spawn(*goal, random.Random(args.seed))
+    controller = _goal_controller(args, goal)
+    sim = GoalSimulation(goal=goal, controller=controller, start=(*start, 0),
+                         integrator=args.integrator, record=False)
+    _record(sim, args.telemetry, sim.run)
+    print(f"Goal {'reached' if sim.reached else 'not reached'} from ({start[0]:.0f}, {start[1]:.0f}) "
+          f"in {sim.time:.2f} s simulated")
+    _print_plans(controller)
+
+
+def run_headless_mission(args):
+    import random
+    import time
+    from routing import plan_route, random_waypoints, route_length
+    from simulation import MissionSimulation
+
+    waypoints = random_waypoints(args.waypoints, random.Random(args.seed))
+    start = args.start or (0, 0)
+    planning = time.perf_counter()
+    route = plan_route(waypoints, start) if args.order == "planned" else list(range(len(waypoints)))
+    planning = time.perf_counter() - planning
+    ordered = [waypoints[i] for i in route]
+    controller = _goal_controller(args, ordered[0])
+    sim = MissionSimulation(ordered, controller=controller, start=(*start, 0), integrator=args.integrator,
+                            record=False)
+    _record(sim, args.telemetry, sim.run)
+    print(f"Mission {'completed' if sim.reached else 'not completed'}: {len(sim.arrivals)}/{len(waypoints)} "
+          f"waypoints in {sim.time:.2f} s simulated, route {route_length(waypoints, route, start):.0f} px "
+          f"({args.order} order, planned in {planning:.3f} s)")
+    _print_plans(controller)
+
+
+def _goal_controller(args, goal):
+    """The --controller for the goal modes: the Kv/Kω law with the given gains, or the MPC aimed at ``goal``."""
+    if args.controller == "mpc":
+        from mpc import MPCController
+        return MPCController(goal=goal, seed=args.seed or 0)
+    from controllers import GoalController
+    return GoalController(Kv=args.kv, Kω=args.kw, Kω2=args.kw2)
+
+
+def _print_plans(controller):
+    """Per-plan timing of an MPC run (nothing for the v/ω law)."""
+    if hasattr(controller, "summary"):
+        plans = controller.summary()
+        print(f"MPC: {plans['count']} plans, mean {plans['mean_us']:.0f} us, p99 {plans['p99_us']:.0f} us, "
+              f"max {plans['max_us']:.0f} us, {plans['overruns']} over the control period")
+
+
+def _record(sim, path, run):
+    """Run ``run`` with a telemetry recorder attached when a path is given."""
+    if not path:
+        return run()
+    from telemetry import TelemetryRecorder
+    with TelemetryRecorder(path) as recorder:
+        sim.add_observer(recorder)
+        return run()
+
+
+def main(argv=None):
     """Main function to select and run the desired navigation mode."""
-    print("Select Mode:")
-    print("1 - Manual Navigation (Arrow Keys)")
-    print("2 - PID Controlled Navigation (Click to Start)")
-    print("3 - PID + Manual (PID Navigation with Interference)")
-    print("4 - Grid Drawing with Accel/Decel Profile (Click to Start)")
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in TOOLS:
+        # Hand the remaining arguments to the tool's own parser
+        module = __import__(TOOLS[argv[0]])
+        sys.argv = [f"main.py {argv[0]}"] + argv[1:]
+        return module.main()
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    mode = args.mode
+    if args.profile:
+        from instrumentation import profiler
+        profiler.enable(dump=args.profile)
+
+    if mode is None:
+        print("Select Mode:")
+        print("1 - Manual Navigation (Arrow Keys)")
+        print("2 - PID Controlled Navigation (Click to Start)")
+        print("3 - PID + Manual (PID Navigation with Interference)")
+        print("4 - Grid Drawing with Accel/Decel Profile (Click to Start)")
 
-    mode = input("Enter mode (1/2/3/4): ").strip()
+        mode = MENU.get(input("Enter mode (1/2/3/4): ").strip())
+        if mode is None:
+            print("Invalid mode! Please enter 1, 2, 3, or 4.")
+            return
 
-    if mode == "1":
+    if mode == "manual":
+        from goal1 import ManualNavigation
         print("Starting Manual Navigation Mode...")
-        ManualNavigation()
-    elif mode == "2":
+        ManualNavigation(rate=args.rate)
+    elif mode == "pid":
+        from goal1 import PIDNavigation
         print("Starting PID Navigation Mode...")
-        PIDNavigation()
-    elif mode == "3":
+        PIDNavigation(Kv=args.kv, Kω=args.kw, Kω2=args.kw2, telemetry=args.telemetry, plot=args.plot,
+                      realtime=not args.fast, long_run=args.long_run, controller=args.controller)
+    elif mode == "pid-manual":
+        # Its own loop blends the keys into the v/ω law: no engine to record, MPC or plot out of process
+        unsupported = [option for option, given in (("--telemetry", args.telemetry), ("--plot", args.plot != "inline"),
+                                                     ("--controller", args.controller != "pid")) if given]
+        if unsupported:
+            parser.error(f"pid-manual does not support {', '.join(unsupported)}")
+        from goal1 import PIDManualNavigation
         print("Starting PID + Manual Navigation Mode...")
-        PIDManualNavigation()
-    elif mode == "4":
+        PIDManualNavigation(rate=args.rate, Kv=args.kv, Kω=args.kw, Kω2=args.kw2)
+    elif mode == "grid":
+        if args.motion == "adaptive":
+            parser.error("--motion adaptive integrates whole segments at once; use it with headless-grid")
+        from goal2 import GridNavigation  # Import new independent grid navigation
         print("Starting Grid Drawing Mode with Acceleration/Deceleration Profile...")
-        nav = GridNavigation()
-        nav.start()
+        nav = GridNavigation(kp=args.kp, ki=args.ki, kd=args.kd, telemetry=args.telemetry, motion=args.motion,
+                             plot=args.plot, realtime=not args.fast, long_run=args.long_run,
+                             pattern=args.pattern)
+        nav.start(args.laps)
+    elif mode == "mission":
+        import random
+        from goal1 import MissionNavigation
+        from routing import random_waypoints
+        print("Starting Multi-waypoint Mission Mode...")
+        MissionNavigation(random_waypoints(args.waypoints, random.Random(args.seed)), order=args.order,
+                          Kv=args.kv, Kω=args.kw, Kω2=args.kw2, telemetry=args.telemetry, plot=args.plot,
+                          realtime=not args.fast, long_run=args.long_run, controller=args.controller)
+    elif mode == "headless-grid":
+        run_headless_grid(args)
+    elif mode == "headless-goal":
+        run_headless_goal(args)
+    elif mode == "headless-mission":
+        if args.integrator == "adaptive":
+            parser.error("--integrator adaptive drives to a single goal; missions need the fixed integrator")
+        run_headless_mission(args)
 
-    else:
-        print("Invalid mode! Please enter 1, 2, 3, or 4.")
 
 if __name__ == "__main__":
     main()
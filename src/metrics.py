@@ -0,0 +1,49 @@
+import math
+import numpy as np
+
+ACCEL_LIMITS = (-3, 15)  # Allowed acceleration range (px/s²)
+
+
+def segments(trajectory):
+    """Split a trajectory into segments at its exact-stop corrections (dt == 0)."""
+    current = []
+    for sample in trajectory:
+        if sample.dt:
+            current.append(sample)
+        elif current:
+            yield current
+            current = []
+    if current:
+        yield current
+
+
+def settling_time(times, errors, band):
+    """Time from the first sample until |error| stays within ``band`` (inf if never)."""
+    outside = np.flatnonzero(np.abs(np.asarray(errors, dtype=float)) > band)
+    if not len(outside):
+        return 0.0
+    if outside[-1] == len(times) - 1:
+        return math.inf
+    return times[outside[-1] + 1] - times[0]
+
+
+def overshoot(errors, reference):
+    """Largest excursion past the target (negative remaining error), relative to ``reference``."""
+    return max(0.0, -min(errors)) / reference if len(errors) and reference else 0.0
+
+
+def acceleration_violations(accelerations, limits=ACCEL_LIMITS):
+    """Number of samples whose acceleration falls outside ``limits``."""
+    a = np.asarray(accelerations, dtype=float)
+    return int(np.count_nonzero((a < limits[0]) | (a > limits[1])))
+
+
+def goal_acceleration(acceleration, dt):
+    """A goal1 sample's acceleration in px/s² (a float, or an array of samples)."""
+    # v is px per tick, so its rate of change converts to px/s² by one more 1/dt
+    return acceleration / dt
+
+
+def path_length(xs, ys):
+    """Length of the polyline through the given points."""
+    return float(np.hypot(np.diff(xs), np.diff(ys)).sum())
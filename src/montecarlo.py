@@ -0,0 +1,203 @@
+import argparse
+import json
+import math
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cli import positive_int
+from controllers import GoalController
+from metrics import ACCEL_LIMITS, goal_acceleration
+from resultcache import DEFAULT_PATH, controller_params, run_cached
+from simulation import GoalSimulation, SimulatedClock, random_spawn
+
+MissionResult = namedtuple("MissionResult", ["index", "start_x", "start_y", "reached", "time_to_goal",
+                                             "path_length", "peak_ω", "peak_jerk", "accel_violations", "steps"])
+
+# Per-mission metrics summarized over the runs that reached the goal
+METRICS = ("time_to_goal", "path_length", "peak_ω", "peak_jerk", "accel_violations", "steps")
+
+
+class MissionStats:
+    """Observer accumulating path length, peak |ω|, acceleration stats and steps without storing samples."""
+
+    def __init__(self, x, y, accel_limits=ACCEL_LIMITS):
+        self.x, self.y = x, y
+        self.accel_limits = accel_limits
+        self.path_length = 0.0
+        self.peak_ω = 0.0
+        self.peak_jerk = 0.0
+        self.accel_violations = 0
+        self.acceleration = 0.0
+        self.steps = 0
+
+    def update(self, sample):
+        if not sample.dt:
+            return
+        self.path_length += math.hypot(sample.x - self.x, sample.y - self.y)
+        self.x, self.y = sample.x, sample.y
+        self.peak_ω = max(self.peak_ω, abs(sample.angular_velocity))
+        acceleration = goal_acceleration(sample.acceleration, sample.dt)
+        self.peak_jerk = max(self.peak_jerk, abs(acceleration - self.acceleration) / sample.dt)
+        self.acceleration = acceleration
+        low, high = self.accel_limits
+        # Allow for rounding when a controller drives exactly at a limit
+        if not low - 1e-6 <= acceleration <= high + 1e-6:
+            self.accel_violations += 1
+        self.steps += 1
+
+
+def mission_rng(seed, index):
+    """Independent, reproducible spawn generator for mission ``index`` of a run."""
+    return random.Random(f"{seed}-{index}")  # String seeds hash the same in every process
+
+
+def controller_seed(seed, index):
+    """Seed for mission ``index``'s controller noise (e.g. MPC sampling), a stream apart from its spawn."""
+    return random.Random(f"{seed}-{index}-controller").getrandbits(32)
+
+
+def make_controller(controller, params, goal, time_step, seed):
+    """The goal1 PID heuristic ("pid", params are its gains) or the sampling MPC ("mpc")."""
+    if controller == "mpc":
+        from mpc import MPCController
+        return MPCController(goal=goal, time_step=time_step, seed=seed, **params)
+    return GoalController(**params)
+
+
+def run_mission(seed, index, params, goal=(300, 300), time_step=0.05, integrator="fixed", controller="pid",
+                accel_limits=None, cache=None):
+    """Run one headless goal1 mission from its seeded spawn.
+
+    ``accel_limits`` makes the simulated drive enforce those limits whatever
+    the controller asks for (see GoalSimulation). With a ``cache`` path, a
+    mission run before is replayed from the result cache (see resultcache.py).
+    """
+    start_x, start_y = random_spawn(*goal, mission_rng(seed, index))
+    stats = MissionStats(start_x, start_y)
+    mission_controller = make_controller(controller, params, goal, time_step, controller_seed(seed, index))
+
+    def simulation(**kwargs):
+        return GoalSimulation(goal=goal, controller=mission_controller, start=(start_x, start_y, 0),
+                              clock=SimulatedClock(time_step), integrator=integrator, accel_limits=accel_limits,
+                              **kwargs)
+
+    if cache is None:
+        sim = simulation(record=False, observers=[stats])
+        sim.run()
+        reached, time_to_goal = sim.reached, sim.time
+    else:
+        scenario = {"mission": "goal", "goal": goal, "start": (start_x, start_y, 0), "time_step": time_step,
+                    "integrator": integrator, "accel_limits": accel_limits}
+        trajectory = run_cached(cache, controller_params(mission_controller), scenario, simulation)
+        for sample in trajectory:
+            stats.update(sample)
+        reached, time_to_goal = trajectory.completed, trajectory.duration
+    return MissionResult(index, start_x, start_y, reached, time_to_goal, stats.path_length,
+                         stats.peak_ω, stats.peak_jerk, stats.accel_violations, stats.steps)
+
+
+def _run_chunk(task):
+    """Run a contiguous block of missions; module-level so worker processes can pickle it."""
+    seed, start, stop, params, kwargs = task
+    return [run_mission(seed, index, params, **kwargs) for index in range(start, stop)]
+
+
+def run_missions(count, seed=0, params=None, workers=None, **kwargs):
+    """Run ``count`` seeded missions across a process pool, in mission order.
+
+    Mission ``i`` always draws its spawn from ``mission_rng(seed, i)``, so the
+    results are identical for the same seed whatever the worker count.
+    """
+    params = params or {}
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, math.ceil(count / (4 * workers)))  # A few chunks per worker to balance load
+    tasks = [(seed, start, min(start + chunk, count), params, kwargs) for start in range(0, count, chunk)]
+    if workers == 1:
+        return [result for task in tasks for result in _run_chunk(task)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [result for block in pool.map(_run_chunk, tasks) for result in block]
+
+
+def describe(values, confidence_z=1.96, percentiles=(5, 25, 50, 75, 95)):
+    """Mean with a normal-approximation confidence interval, spread and percentiles."""
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return {"n": 0}
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+    half_width = confidence_z * std / math.sqrt(len(values))
+    summary = {"n": len(values), "mean": mean, "ci": (mean - half_width, mean + half_width), "std": std,
+               "min": float(values.min()), "max": float(values.max())}
+    summary.update({f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))})
+    return summary
+
+
+def success_rate(results, confidence_z=1.96):
+    """Fraction of missions that reached the goal, with a Wilson score interval."""
+    n = len(results)
+    if not n:
+        return {"n": 0}
+    p = sum(r.reached for r in results) / n
+    z2 = confidence_z ** 2
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half_width = confidence_z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return {"n": n, "rate": p, "ci": (center - half_width, center + half_width)}
+
+
+def summarize(results):
+    """Distributions of every metric over the missions that reached the goal."""
+    reached = [r for r in results if r.reached]
+    summary = {"success": success_rate(results)}
+    for metric in METRICS:
+        summary[metric] = describe([getattr(r, metric) for r in reached])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo evaluation of goal1 missions from seeded spawns")
+    parser.add_argument("--missions", type=positive_int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--kv", type=float, default=0.8, help="Kv")
+    parser.add_argument("--kw", type=float, default=0.1, help="Kω")
+    parser.add_argument("--kw2", type=float, default=0.05, help="Kω2")
+    parser.add_argument("--integrator", choices=["fixed", "adaptive"], default="fixed")
+    parser.add_argument("--controller", choices=["pid", "mpc"], default="pid",
+                        help="The PID heuristic (with the gains above) or the sampling MPC (see mpc.py)")
+    parser.add_argument("--accel-limits", action="store_true",
+                        help="Have the simulated drive enforce the acceleration limits for any controller")
+    parser.add_argument("--output", help="Write the summary and every mission result as JSON to this file")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_PATH, metavar="PATH",
+                        help="Replay missions simulated before from this result cache (see resultcache.py)")
+    args = parser.parse_args()
+
+    params = {"Kv": args.kv, "Kω": args.kw, "Kω2": args.kw2} if args.controller == "pid" else {}
+    results = run_missions(args.missions, args.seed, params, args.workers, integrator=args.integrator,
+                           controller=args.controller, accel_limits=ACCEL_LIMITS if args.accel_limits else None,
+                           cache=args.cache)
+    summary = summarize(results)
+
+    success = summary["success"]
+    print(f"{success['n']} missions, seed {args.seed}: {success['rate']:.1%} reached the goal "
+          f"(95% CI {success['ci'][0]:.1%}-{success['ci'][1]:.1%})")
+    print(f"{'metric':<18}{'mean':>12}{'95% CI':>26}{'std':>12}{'p5':>12}{'p50':>12}{'p95':>12}")
+    for metric in METRICS:
+        s = summary[metric]
+        if not s["n"]:
+            continue
+        ci = f"{s['ci'][0]:.3f}-{s['ci'][1]:.3f}"
+        print(f"{metric:<18}{s['mean']:>12.3f}{ci:>26}{s['std']:>12.3f}"
+              f"{s['p5']:>12.3f}{s['p50']:>12.3f}{s['p95']:>12.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"seed": args.seed, "controller": args.controller, "params": params, "summary": summary,
+                       "missions": [r._asdict() for r in results]}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
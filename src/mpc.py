@@ -0,0 +1,158 @@
+import math
+import time
+
+import numpy as np
+
+from geometry import goal_errors
+from instrumentation import PhaseStats
+from metrics import ACCEL_LIMITS
+
+HALF_CANVAS = 200  # The 400 x 400 turtle window
+
+
+class MPCController:
+    """Sampling model-predictive controller for the goal1 mission.
+
+    Every tick it draws ``samples`` control sequences of ``horizon`` ticks
+    (acceleration in px/s² and turn in degrees per tick, held over
+    ``segments`` equal pieces) around the best sequence of the previous tick,
+    rolls the unicycle model out for all of them at once, and applies the
+    first action of the cheapest. The cost is the predicted time to reach
+    the goal, a jerk term for smooth acceleration and a penalty per tick
+    spent outside ``bounds``; accelerations are sampled inside
+    ``accel_limits``, so every candidate respects them.
+
+    GoalSimulation calls ``plan`` with the full pose instead of
+    ``compute``, and applies the returned (v, ω) unchanged. The wall time of
+    every plan is kept in ``timing`` (see instrumentation.PhaseStats), and
+    plans slower than the tick they were computed for are counted in
+    ``overruns``.
+    """
+
+    def __init__(self, goal=(300, 300), samples=256, horizon=80, segments=8, time_step=0.05,
+                 accel_limits=ACCEL_LIMITS, max_ω=20, bounds=None, tolerance=5, jerk_weight=2e-4,
+                 bounds_weight=1.0, explore=0.1, seed=0):
+        self.goal = goal
+        self.goal_x, self.goal_y = goal
+        self.samples = samples
+        self.horizon = horizon
+        self.segments = segments
+        self.time_step = time_step  # Model step; plans are converted with the measured dt
+        self.accel_limits = accel_limits
+        self.min_accel, self.max_accel = accel_limits
+        self.max_ω = max_ω  # Degrees per tick, as GoalController
+        if bounds is None:
+            # The canvas, grown to keep the goal (and its approach) inside
+            margin = 50
+            bounds = (min(-HALF_CANVAS, self.goal_x - margin), min(-HALF_CANVAS, self.goal_y - margin),
+                      max(HALF_CANVAS, self.goal_x + margin), max(HALF_CANVAS, self.goal_y + margin))
+        self.bounds = bounds  # (min x, min y, max x, max y)
+        self.tolerance = tolerance
+        self.jerk_weight = jerk_weight  # Seconds of cost per (px/s³ · s)² of acceleration change
+        self.bounds_weight = bounds_weight  # Seconds of cost per tick out of bounds
+        self.explore = explore  # Fraction of samples drawn uniformly instead of around the last plan
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        self.hold = -(-horizon // segments)  # Ticks per segment
+        self.plan_accel = np.zeros(horizon)  # Best sequence so far
+        self.plan_ω = np.zeros(horizon)
+        self.acceleration = 0.0  # Last applied acceleration (px/s²)
+        self.cost = 0.0  # Predicted cost of the last applied plan
+        self.timing = PhaseStats()
+        self.overruns = 0
+
+        # Sample fields shared with GoalController
+        self.prev_error = 0
+        self.integral = 0
+        self.derivative = 0
+
+    def _sample(self, facing):
+        """Candidate (acceleration, turn) sequences, shape (samples, horizon) each."""
+        n, h, s = self.samples, self.horizon, self.segments
+        span = self.max_accel - self.min_accel
+        accel = self.rng.normal(0, span / 4, (n, s))
+        turn = self.rng.normal(0, self.max_ω / 4, (n, s))
+        uniform = int(n * self.explore)
+        accel[:uniform] = self.rng.uniform(-span, span, (uniform, s))
+        turn[:uniform] = self.rng.uniform(-2 * self.max_ω, 2 * self.max_ω, (uniform, s))
+        accel[-1] = turn[-1] = 0  # Keep the previous plan itself in the running
+        accel = self.plan_accel + np.repeat(accel, self.hold, axis=1)[:, :h]
+        turn = self.plan_ω + np.repeat(turn, self.hold, axis=1)[:, :h]
+        accel[:uniform] -= self.plan_accel  # Uniform draws replace the plan rather than perturb it
+        turn[:uniform] -= self.plan_ω
+        # And one greedy candidate: turn to face the goal as fast as allowed, at full acceleration
+        accel[-2] = self.max_accel
+        turn[-2] = np.diff(np.clip(np.arange(h + 1) * self.max_ω, 0, abs(facing))) * math.copysign(1, facing)
+        np.clip(accel, self.min_accel, self.max_accel, out=accel)
+        np.clip(turn, -self.max_ω, self.max_ω, out=turn)
+        return accel, turn
+
+    def rollout(self, x, y, heading, speed, accel, turn):
+        """Positions, final speed and heading of each sequence from one pose (speed in px/s)."""
+        dt = self.time_step
+        speeds = np.maximum(speed + np.cumsum(accel, axis=1) * dt, 0)
+        headings = heading + np.cumsum(turn, axis=1)  # Turn first, then move, as GoalSimulation.step
+        step = speeds * dt
+        rad = np.radians(headings)
+        xs = x + np.cumsum(step * np.cos(rad), axis=1)
+        ys = y + np.cumsum(step * np.sin(rad), axis=1)
+        return xs, ys, speeds[:, -1], headings[:, -1]
+
+    def evaluate(self, x, y, heading, speed, accel, turn):
+        """Cost of each sequence: predicted time to goal plus jerk and bounds penalties."""
+        dt = self.time_step
+        xs, ys, final_speed, final_heading = self.rollout(x, y, heading, speed, accel, turn)
+        distance = np.hypot(self.goal_x - xs, self.goal_y - ys)
+        inside = distance < self.tolerance
+        arrived = inside.any(axis=1)
+
+        # Past the horizon: full acceleration along a straight line, after turning to face the goal
+        d, u = distance[:, -1], final_speed
+        facing = np.degrees(np.arctan2(self.goal_y - ys[:, -1], self.goal_x - xs[:, -1])) - final_heading
+        facing = np.abs((facing + 180) % 360 - 180)
+        to_go = (np.sqrt(u * u + 2 * self.max_accel * d) - u) / self.max_accel + facing / self.max_ω * dt
+        cost = np.where(arrived, (inside.argmax(axis=1) + 1) * dt, self.horizon * dt + to_go)
+
+        # The mission ends on arrival: nothing after it counts
+        live = np.arange(self.horizon) <= np.where(arrived, inside.argmax(axis=1), self.horizon)[:, None]
+        jerk = np.diff(accel, axis=1, prepend=self.acceleration)
+        cost += self.jerk_weight * (jerk * jerk * live).sum(axis=1) * dt
+        min_x, min_y, max_x, max_y = self.bounds
+        outside = (xs < min_x) | (xs > max_x) | (ys < min_y) | (ys > max_y)
+        cost += self.bounds_weight * (outside & live).sum(axis=1)
+        return cost
+
+    def plan(self, x, y, heading, velocity, dt):
+        """Return (v, ω) for this tick from the pose and the current speed (px per tick)."""
+        start = time.perf_counter_ns()
+        distance_error, angle_error = goal_errors(x, y, heading, self.goal_x, self.goal_y)
+        self.integral += distance_error * dt
+        self.derivative = (distance_error - self.prev_error) / dt if dt > 0 else 0
+        self.prev_error = distance_error
+
+        speed = velocity / dt if dt > 0 else 0.0
+        accel, turn = self._sample(angle_error)
+        cost = self.evaluate(x, y, heading, speed, accel, turn)
+        best = int(np.argmin(cost))
+        self.cost = float(cost[best])
+
+        # Warm start: the next tick samples around this plan, shifted by one tick
+        self.plan_accel = np.append(accel[best, 1:], accel[best, -1])
+        self.plan_ω = np.append(turn[best, 1:], 0.0)
+        acceleration = float(accel[best, 0])
+        ω = float(turn[best, 0])
+        new_speed = max(speed + acceleration * dt, 0.0)
+        self.acceleration = (new_speed - speed) / dt if dt > 0 else 0.0
+
+        elapsed = time.perf_counter_ns() - start
+        self.timing.record(elapsed)
+        if elapsed > dt * 1e9:
+            self.overruns += 1
+        return new_speed * dt, ω
+
+    def summary(self):
+        """Per-plan wall time (see PhaseStats.summary) with the overrun count."""
+        summary = self.timing.summary()
+        summary["overruns"] = self.overruns
+        return summary
@@ -0,0 +1,233 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from geometry import bearing, wrap_angle
+
+# A compiled mission is a list of ("turn", angle) and ("path", PathPiece) pieces:
+# in-place turns where the robot must stop, and continuous stretches sampled
+# along their velocity plan (times from the stretch start, "remaining" arc length)
+PathPiece = namedtuple("PathPiece", ["times", "x", "y", "heading", "velocity", "angular_velocity",
+                                     "acceleration", "remaining"])
+
+
+def _place(points, origin, heading):
+    """Rotate pattern points by ``heading`` degrees and translate them to ``origin``."""
+    c, s = math.cos(math.radians(heading)), math.sin(math.radians(heading))
+    return [(origin[0] + x * c - y * s, origin[1] + x * s + y * c) for x, y in points]
+
+
+def grid_pattern(grid_steps=4, grid_size=100, origin=(0, 0), heading=0):
+    """Waypoints of the goal2 grid mission, one per move as GridNavigation.draw_grid drives it."""
+    points, x, y, direction = [(0.0, 0.0)], 0.0, 0.0, 0
+    for _ in range(grid_steps):
+        for _ in range(grid_steps):
+            x += grid_size * math.cos(math.radians(direction))
+            y += grid_size * math.sin(math.radians(direction))
+            points.append((round(x, 9), round(y, 9)))
+        direction += 90
+        x += grid_size * math.cos(math.radians(direction))
+        y += grid_size * math.sin(math.radians(direction))
+        points.append((round(x, 9), round(y, 9)))
+        direction += 90
+    return _place(points, origin, heading)
+
+
+def coverage_pattern(rows, cols, spacing=100, origin=(0, 0), heading=0):
+    """Boustrophedon waypoints sweeping every row line of an ``rows`` x ``cols`` cell grid.
+
+    Each sweep visits every cell vertex, so the raw list is mostly collinear
+    points for the compiler to merge.
+    """
+    points = []
+    for row in range(rows + 1):
+        columns = range(cols + 1) if row % 2 == 0 else range(cols, -1, -1)
+        points.extend((col * spacing, row * spacing) for col in columns)
+    return _place(points, origin, heading)
+
+
+def simplify(waypoints, tolerance=1e-6):
+    """Drop repeated waypoints and merge collinear segments running the same way."""
+    merged = []
+    for point in waypoints:
+        if merged and math.dist(point, merged[-1]) <= tolerance:
+            continue
+        if len(merged) >= 2:
+            (ax, ay), (bx, by) = merged[-2], merged[-1]
+            ux, uy = bx - ax, by - ay
+            vx, vy = point[0] - bx, point[1] - by
+            length = math.hypot(ux, uy)
+            if abs(ux * vy - uy * vx) <= tolerance * length and ux * vx + uy * vy > 0:
+                merged[-1] = point  # Same line, same direction: extend the segment
+                continue
+        merged.append(point)
+    return merged
+
+
+def _runs(waypoints, blend_radius, max_blend_angle, lateral_accel):
+    """Split the path at stop-and-turn corners; blend the others with circular arcs.
+
+    Yield (turn angle before the run, primitives), where a primitive is
+    ("line", start, direction, length) or ("arc", center, radius, start angle,
+    sweep, speed limit), all angles in degrees.
+    """
+    headings = [bearing(bx - ax, by - ay) for (ax, ay), (bx, by) in zip(waypoints, waypoints[1:])]
+    lengths = [math.dist(a, b) for a, b in zip(waypoints, waypoints[1:])]
+    turns = [wrap_angle(h1 - h0) for h0, h1 in zip(headings, headings[1:])]
+
+    # Tangent offset of each corner's arc, limited to half of either neighbouring segment
+    offsets, radii = [], []
+    for i, turn in enumerate(turns):
+        half = math.tan(math.radians(abs(turn)) / 2)
+        if abs(turn) > max_blend_angle or blend_radius <= 0 or half == 0:
+            offsets.append(0.0)
+            radii.append(0.0)
+            continue
+        radius = min(blend_radius, lengths[i] / 2 / half, lengths[i + 1] / 2 / half)
+        offsets.append(radius * half)
+        radii.append(radius)
+
+    primitives, turn_before = [], 0.0
+    entry = 0.0  # Offset already consumed at the start of the current segment
+    for i, (start, heading, length) in enumerate(zip(waypoints, headings, lengths)):
+        exit_offset = offsets[i] if i < len(turns) else 0.0
+        rad = math.radians(heading)
+        ux, uy = math.cos(rad), math.sin(rad)
+        line_start = (start[0] + entry * ux, start[1] + entry * uy)
+        primitives.append(("line", line_start, heading, length - entry - exit_offset))
+        if i == len(turns):
+            break
+        if radii[i]:
+            turn = turns[i]
+            side = 1 if turn > 0 else -1  # Centre to the left for left turns
+            corner = waypoints[i + 1]
+            tangent = (corner[0] - exit_offset * ux, corner[1] - exit_offset * uy)
+            center = (tangent[0] - side * radii[i] * uy, tangent[1] + side * radii[i] * ux)
+            speed = math.sqrt(lateral_accel * radii[i])
+            primitives.append(("arc", center, radii[i], heading - side * 90, turn, speed))
+            entry = exit_offset
+        else:
+            yield turn_before, primitives
+            primitives, turn_before, entry = [], turns[i], 0.0
+    yield turn_before, primitives
+
+
+def _primitive_length(primitive):
+    if primitive[0] == "line":
+        return max(primitive[3], 0.0)
+    return primitive[2] * math.radians(abs(primitive[4]))
+
+
+def _pose(primitives, starts, s):
+    """Position and heading at arc length ``s`` along a run (vectorized)."""
+    index = np.clip(np.searchsorted(starts, s, side="right") - 1, 0, len(primitives) - 1)
+    x, y, heading = np.empty_like(s), np.empty_like(s), np.empty_like(s)
+    for k, primitive in enumerate(primitives):
+        mask = index == k
+        local = s[mask] - starts[k]
+        if primitive[0] == "line":
+            _, (x0, y0), direction, _ = primitive
+            rad = math.radians(direction)
+            x[mask] = x0 + local * math.cos(rad)
+            y[mask] = y0 + local * math.sin(rad)
+            heading[mask] = direction
+        else:
+            _, (cx, cy), radius, angle0, sweep, _ = primitive
+            sign = 1 if sweep > 0 else -1
+            angle = np.radians(angle0) + sign * local / radius
+            x[mask] = cx + radius * np.cos(angle)
+            y[mask] = cy + radius * np.sin(angle)
+            heading[mask] = np.degrees(angle) + sign * 90
+    return x, y, heading % 360
+
+
+def _velocity_plan(primitives, max_accel, max_decel, max_velocity, resolution):
+    """Fastest rest-to-rest speed along the run within the acceleration limits.
+
+    Speed is limited on arcs (lateral acceleration) and by ``max_velocity``;
+    a forward pass applies ``max_accel`` and a backward pass ``max_decel``.
+    Between nodes the acceleration is constant, so the plan stays within
+    [-max_decel, max_accel] everywhere. The acceleration steps between
+    nodes without any jerk limit: unlike the stepped PID and the "profile"
+    motion, the plan ignores the velocity PID's ``accel_rate``. Returns node
+    arc lengths, speeds and times, and the arc length at which each
+    primitive starts.
+    """
+    lengths = [_primitive_length(p) for p in primitives]
+    starts = np.concatenate(([0.0], np.cumsum(lengths)))
+    total = starts[-1]
+    nodes = max(int(math.ceil(total / resolution)), 1) + 1
+    s = np.linspace(0.0, total, nodes)
+    ds = s[1] - s[0]
+
+    limit = np.full(nodes, np.inf if max_velocity is None else float(max_velocity))
+    for k, primitive in enumerate(primitives):
+        if primitive[0] == "arc":
+            inside = (s >= starts[k] - ds) & (s <= starts[k + 1] + ds)
+            limit[inside] = np.minimum(limit[inside], primitive[5])
+    limit[0] = limit[-1] = 0.0
+
+    v = np.empty(nodes)
+    v[0] = 0.0
+    for i in range(1, nodes):
+        v[i] = min(limit[i], math.sqrt(v[i - 1] ** 2 + 2 * max_accel * ds))
+    for i in range(nodes - 2, -1, -1):
+        v[i] = min(v[i], math.sqrt(v[i + 1] ** 2 + 2 * max_decel * ds))
+
+    dt = 2 * ds / np.maximum(v[:-1] + v[1:], 1e-12)
+    return s, v, np.concatenate(([0.0], np.cumsum(dt))), starts[:-1]
+
+
+def _sample_run(primitives, max_accel, max_decel, max_velocity, resolution, time_step):
+    s_nodes, v_nodes, t_nodes, starts = _velocity_plan(primitives, max_accel, max_decel, max_velocity, resolution)
+    duration = t_nodes[-1]
+    times = np.append(np.arange(1, math.ceil(duration / time_step)) * time_step, duration)
+    index = np.clip(np.searchsorted(t_nodes, times, side="right") - 1, 0, len(t_nodes) - 2)
+    span = t_nodes[index + 1] - t_nodes[index]
+    accel = (v_nodes[index + 1] - v_nodes[index]) / np.where(span > 0, span, 1)
+    tau = times - t_nodes[index]
+    velocity = v_nodes[index] + accel * tau
+    s = np.minimum(s_nodes[index] + v_nodes[index] * tau + accel * tau ** 2 / 2, s_nodes[-1])
+    velocity[-1] = 0.0
+
+    x, y, heading = _pose(primitives, starts, s)
+    # Turn rate follows the curvature of the primitive under each sample
+    curvature = np.zeros_like(s)
+    owner = np.clip(np.searchsorted(starts, s, side="right") - 1, 0, len(primitives) - 1)
+    for k, primitive in enumerate(primitives):
+        if primitive[0] == "arc":
+            curvature[owner == k] = math.degrees(1 / primitive[2]) * (1 if primitive[4] > 0 else -1)
+    return PathPiece(times, x, y, heading, velocity, velocity * curvature, accel, s_nodes[-1] - s)
+
+
+def compile_path(waypoints, heading=0, max_accel=15, max_decel=3, max_velocity=None, blend_radius=50,
+                 max_blend_angle=90, lateral_accel=3, resolution=0.5, time_step=0.1):
+    """Compile waypoints into a list of motion pieces for GridSimulation.follow.
+
+    Collinear segments are merged first. Corners turning at most
+    ``max_blend_angle`` degrees become arcs of up to ``blend_radius`` px taken
+    at a speed whose lateral acceleration stays within ``lateral_accel``;
+    sharper corners stop and turn in place. Each stretch between stops gets
+    the fastest speed plan within [-max_decel, max_accel] px/s² (the velocity
+    PID limits), sampled every ``time_step``. ``heading`` is the starting
+    heading; the robot first turns in place to face the path if needed.
+
+    The plan is acceleration-limited only. It does not apply the PID's jerk
+    limit (``accel_rate``), so a compiled mission models a vehicle that can
+    change its acceleration instantly, and its times are not comparable
+    one-to-one with the other grid motions.
+    """
+    waypoints = simplify([tuple(map(float, p)) for p in waypoints])
+    if len(waypoints) < 2:
+        return []
+
+    pieces = []
+    runs = list(_runs(waypoints, blend_radius, max_blend_angle, lateral_accel))
+    runs[0] = (wrap_angle(runs[0][1][0][2] - heading), runs[0][1])  # Face the first segment
+    for turn, primitives in runs:
+        if abs(turn) > 1e-9:
+            pieces.append(("turn", turn))
+        pieces.append(("path", _sample_run(primitives, max_accel, max_decel, max_velocity, resolution,
+                                           time_step)))
+    return pieces
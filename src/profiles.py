@@ -0,0 +1,110 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
+def _velocity_change(dv, jerk, accel_limit):
+    """Jerk-limited ramp for a velocity change ``dv``: (ramp time, hold time, peak accel)."""
+    if dv <= 0:
+        return 0.0, 0.0, 0.0
+    if dv >= accel_limit ** 2 / jerk:
+        ramp = accel_limit / jerk  # Reaches the limit: trapezoidal acceleration
+        return ramp, dv / accel_limit - ramp, accel_limit
+    peak = math.sqrt(dv * jerk)  # Never reaches the limit: triangular acceleration
+    return peak / jerk, 0.0, peak
+
+
+class MotionProfile:
+    """Rest-to-rest jerk-limited (S-curve) velocity profile over ``distance``.
+
+    Acceleration ramps at ``jerk`` up to at most ``max_accel``, back to zero,
+    then down to at most ``-max_decel`` and back to zero, ending at rest
+    exactly on ``distance``. With ``max_velocity`` a cruise phase is inserted
+    instead of exceeding it.
+    """
+
+    def __init__(self, distance, max_accel, max_decel, jerk, max_velocity=None):
+        self.distance = distance
+        self.sign = 1 if distance >= 0 else -1
+        length = abs(distance)
+
+        def phases_for(peak_velocity):
+            up_ramp, up_hold, up_peak = _velocity_change(peak_velocity, jerk, max_accel)
+            down_ramp, down_hold, down_peak = _velocity_change(peak_velocity, jerk, max_decel)
+            return [(up_ramp, jerk), (up_hold, 0.0), (up_ramp, -jerk),
+                    (down_ramp, -jerk), (down_hold, 0.0), (down_ramp, jerk)]
+
+        def covered(peak_velocity):
+            # Each ramp is symmetric, so it covers peak_velocity/2 times its duration
+            return peak_velocity * sum(duration for duration, _ in phases_for(peak_velocity)) / 2
+
+        cruise = 0.0
+        if max_velocity is not None and covered(max_velocity) <= length:
+            peak = max_velocity
+            cruise = (length - covered(peak)) / peak if peak else 0.0
+        else:
+            lo, hi = 0.0, 1.0
+            while covered(hi) < length:
+                hi *= 2
+            for _ in range(100):  # Bisection on the peak velocity
+                mid = (lo + hi) / 2
+                lo, hi = (mid, hi) if covered(mid) < length else (lo, mid)
+            peak = hi
+
+        phases = phases_for(peak)
+        phases.insert(3, (cruise, 0.0))
+
+        # Closed-form state at the start of each constant-jerk phase
+        self.starts, self.phases = [], []
+        t = x = v = a = 0.0
+        for duration, j in phases:
+            if duration <= 0:
+                continue
+            self.starts.append(t)
+            self.phases.append((duration, j, x, v, a))
+            x += v * duration + a * duration ** 2 / 2 + j * duration ** 3 / 6
+            v += a * duration + j * duration ** 2 / 2
+            a += j * duration
+            t += duration
+        self.duration = t
+        self.peak_velocity = peak
+
+    def sample(self, t):
+        """Return (position, velocity, acceleration) at time ``t``."""
+        if t >= self.duration:
+            return self.distance, 0.0, 0.0
+        index = max(np.searchsorted(self.starts, t, side="right") - 1, 0)
+        duration, j, x, v, a = self.phases[index]
+        s = t - self.starts[index]
+        position = x + v * s + a * s ** 2 / 2 + j * s ** 3 / 6
+        velocity = v + a * s + j * s ** 2 / 2
+        return self.sign * position, self.sign * velocity, self.sign * (a + j * s)
+
+    def sample_array(self, time_step):
+        """Sample at every ``time_step`` up to the end; the last sample is exactly at rest on target."""
+        times = np.append(np.arange(1, math.ceil(self.duration / time_step)) * time_step, self.duration)
+        values = np.array([self.sample(t) for t in times]).reshape(-1, 3)
+        values[-1] = (self.distance, 0.0, 0.0)
+        return times, values[:, 0], values[:, 1], values[:, 2]
+
+
+@lru_cache(maxsize=256)
+def motion_profile(distance, max_accel, max_decel, jerk, max_velocity=None):
+    """Cached MotionProfile; repeated segments with the same key cost one lookup."""
+    return MotionProfile(distance, max_accel, max_decel, jerk, max_velocity)
+
+
+@lru_cache(maxsize=256)
+def sampled_profile(distance, max_accel, max_decel, jerk, time_step, max_velocity=None):
+    """Cached playback arrays (times, positions, velocities, accelerations), read-only."""
+    arrays = motion_profile(distance, max_accel, max_decel, jerk, max_velocity).sample_array(time_step)
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+def profile_for(pid, distance, time_step):
+    """Sampled profile honouring a PIDController's limits (max/min output, accel_rate jerk)."""
+    return sampled_profile(float(distance), float(pid.max_output), float(-pid.min_output),
+                           float(pid.accel_rate), float(time_step))
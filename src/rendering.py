@@ -0,0 +1,148 @@
+import math
+import time
+from collections import deque
+
+LONG_RUN_TRAIL = 5000  # Trail vertices kept on screen in long-run mode
+
+
+class TurtleObserver:
+    """Mirror a simulation's pose onto a live turtle."""
+
+    phase = "render"  # Profiling phase (see instrumentation.py)
+
+    def __init__(self, turtle, screen=None):
+        self.turtle = turtle
+        self.screen = screen
+
+    def update(self, sample):
+        self.turtle.setheading(sample.heading)
+        self.turtle.goto(sample.x, sample.y)
+        if self.screen is not None:
+            self.screen.update()
+
+
+class TurtleRenderer:
+    """Draw a simulation on a turtle in batches at a fixed display rate.
+
+    Per-move animation is turned off (``tracer(0)``) and poses are buffered:
+    each tick only extends the trail, merging points that stay within
+    ``tolerance`` pixels of a straight run, so a whole run becomes one
+    polyline vertex. The screen is redrawn at most ``fps`` times per second of
+    wall time, whatever the control rate, and at the end of every segment.
+
+    With ``max_trail`` the renderer draws the trail itself, for runs of any
+    length in bounded memory: the turtle's undo buffer is disabled, new
+    vertices go to a short canvas line, and every ``merge_every`` vertices
+    they are merged into a single line holding at most ``max_trail`` of the
+    most recent vertices.
+    """
+
+    phase = "render"  # Profiling phase (see instrumentation.py)
+
+    def __init__(self, turtle, screen=None, fps=30, tolerance=0.5, clock=time.perf_counter,
+                 max_trail=None, merge_every=256):
+        self.turtle = turtle
+        self.screen = screen or turtle.getscreen()
+        self.screen.tracer(0)
+        self.frame_interval = 1.0 / fps if fps else 0
+        self.tolerance = tolerance
+        self.clock = clock
+        self.last_frame = float("-inf")
+        self.frames = 0
+
+        self.vertices = []  # Trail corners not drawn yet
+        self.anchor = self.end = tuple(turtle.position())  # Start and latest point of the current run
+        self.direction = None  # Unit vector of the current run, once it is longer than the tolerance
+        self.reach = 0.0  # Furthest distance along the run
+        self.heading = turtle.heading()
+
+        self.old = None  # Bounded trail (max_trail): merged vertices, oldest dropped first
+        if max_trail:
+            self.turtle.setundobuffer(None)  # Otherwise every goto keeps an undo entry
+            self.turtle.penup()
+            self.canvas = self.screen.getcanvas()
+            color = self.turtle.pencolor()
+            if not isinstance(color, str):
+                scale = 255 / self.screen.colormode()
+                color = "#%02x%02x%02x" % tuple(round(c * scale) for c in color)
+            start = self._coords([self.end, self.end])
+            self.old_line = self.canvas.create_line(*start, fill=color, width=self.turtle.pensize())
+            self.recent_line = self.canvas.create_line(*start, fill=color, width=self.turtle.pensize())
+            self.old = deque(maxlen=max_trail)
+            self.recent = [self.end]  # Vertices since the last merge
+            self.merge_every = merge_every
+
+    def update(self, sample):
+        self.heading = sample.heading
+        self._extend(sample.x, sample.y)
+        if not sample.dt or self.clock() - self.last_frame >= self.frame_interval:
+            self.flush()
+
+    def _extend(self, x, y):
+        """Add a point to the trail, starting a new run when it leaves the current line."""
+        ax, ay = self.anchor
+        dx, dy = x - ax, y - ay
+        if self.direction is None:
+            length = math.hypot(dx, dy)
+            if length > self.tolerance:
+                self.direction = (dx / length, dy / length)
+                self.reach = length
+            self.end = (x, y)
+            return
+
+        ux, uy = self.direction
+        along = dx * ux + dy * uy
+        if abs(dx * uy - dy * ux) <= self.tolerance and along >= self.reach - self.tolerance:
+            self.reach = max(self.reach, along)
+            self.end = (x, y)
+            return
+
+        self.vertices.append(self.end)  # Corner: close the run at its last point
+        self.anchor = self.end
+        self.direction = None
+        self._extend(x, y)
+
+    def _coords(self, points):
+        """Flat canvas coordinates for turtle-space points."""
+        sx, sy = self.screen.xscale, -self.screen.yscale
+        return [c for x, y in points for c in (x * sx, y * sy)]
+
+    def _draw_bounded(self):
+        self.recent.extend(self.vertices)
+        if len(self.recent) > self.merge_every:
+            self.old.extend(self.recent)  # The last vertex stays in both, joining the lines
+            self.recent = self.recent[-1:]
+            self.canvas.coords(self.old_line, self._coords(self.old))
+        self.canvas.coords(self.recent_line, self._coords(self.recent + [self.end]))
+
+    def flush(self):
+        """Draw the buffered trail and pose, then refresh the screen once."""
+        if self.old is not None:
+            self._draw_bounded()
+        else:
+            for vertex in self.vertices:
+                self.turtle.goto(vertex)
+        self.vertices.clear()
+        self.turtle.setheading(self.heading)
+        self.turtle.goto(self.end)
+        self.screen.update()
+        self.last_frame = self.clock()
+        self.frames += 1
+
+
+class PlotObserver:
+    """Feed selected sample fields into a Visualization."""
+
+    phase = "plot"  # Profiling phase (see instrumentation.py)
+
+    def __init__(self, visualization, fields=("velocity", "acceleration"), modes=None):
+        self.visualization = visualization
+        self.fields = fields
+        self.modes = modes  # Only plot samples from these modes (None = all)
+
+    def update(self, sample):
+        if not sample.dt:
+            return  # Exact-stop corrections are not plotted
+        if self.modes is not None and sample.mode not in self.modes:
+            return
+        self.visualization.update(sample.time, *(getattr(sample, f) for f in self.fields))
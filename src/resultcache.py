@@ -0,0 +1,204 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+import numpy as np
+
+from simulation import Sample, Trajectory
+from telemetry import MODES, MODE_CODES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.environ.get("FLYT_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "flytbase",
+                                                            "results.sqlite")
+DEFAULT_MAX_BYTES = 256 << 20
+
+# Modules whose code decides what a run produces (and this one, which owns the blob
+# format); editing any of them invalidates the cache
+CODE_MODULES = ("controllers", "simulation", "geometry", "profiles", "paths", "integrators", "mpc", "resultcache")
+
+# Full-precision sample rows (telemetry files use float32 for most fields)
+SAMPLE_DTYPE = np.dtype([(field, "u1" if field == "mode" else "f8") for field in Sample._fields])
+
+
+def code_version(modules=CODE_MODULES):
+    """Hash of the source of the modules that determine simulation results."""
+    digest = hashlib.sha256()
+    for module in modules:
+        path = os.path.join(HERE, f"{module}.py")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(module.encode() + b"\0" + f.read())
+    return digest.hexdigest()
+
+
+def controller_params(controller):
+    """The constructor fields of a controller (e.g. PIDController gains and limits), for cache keys."""
+    names = inspect.signature(type(controller).__init__).parameters
+    params = {name: getattr(controller, name) for name in names if hasattr(controller, name)}
+    return {"class": type(controller).__name__, **params}
+
+
+def encode(trajectory, level=1):
+    """Compress a trajectory's samples into one blob, column by column."""
+    rows = np.empty(len(trajectory), dtype=SAMPLE_DTYPE)
+    if len(trajectory):
+        for field, column in zip(Sample._fields, zip(*trajectory.samples)):
+            rows[field] = [MODE_CODES.get(mode, 255) for mode in column] if field == "mode" else column
+    return zlib.compress(rows.tobytes(), level)
+
+
+def decode(blob, completed):
+    """Rebuild a Trajectory from a blob written by ``encode``."""
+    rows = np.frombuffer(zlib.decompress(blob), dtype=SAMPLE_DTYPE)
+    names = np.array(MODES + ("",) * (256 - len(MODES)), dtype=object)
+    columns = [names[rows[field]].tolist() if field == "mode" else rows[field].tolist() for field in Sample._fields]
+    trajectory = Trajectory()
+    trajectory.samples = list(map(Sample._make, zip(*columns)))
+    trajectory.completed = completed
+    return trajectory
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of simulation trajectories.
+
+    Entries live in one SQLite file, keyed by a hash of the controller
+    parameters, the scenario and the code version, and hold the run's samples
+    as a zlib-compressed blob. Opening the cache after any of
+    ``CODE_MODULES`` changed drops every entry. When the blobs outgrow
+    ``max_bytes``, the least recently used entries are evicted. Several
+    processes (e.g. tuning workers) can share one file.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = code_version()
+        self.hits = self.misses = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")  # Readers never wait on the writing worker
+        self.db.execute("PRAGMA synchronous=NORMAL")  # A crash may lose the last entries, never corrupt the file
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, completed INTEGER, "
+                        "size INTEGER, used REAL, blob BLOB)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            row = self.db.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                self.db.execute("DELETE FROM results")
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+        self.total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def __getstate__(self):
+        return {"path": self.path, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_bytes"])
+
+    def key(self, params, scenario):
+        """Hash of the controller parameters and scenario (any JSON-serializable values)."""
+        text = json.dumps({"params": params, "scenario": scenario, "version": self.version},
+                          sort_keys=True, default=repr)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, key):
+        """The cached trajectory for ``key``, or None."""
+        row = self.db.execute("SELECT completed, blob FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+        return decode(row[1], bool(row[0]))
+
+    def put(self, key, trajectory):
+        blob = encode(trajectory)
+        self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                        (key, int(trajectory.completed), len(blob), time.time(), blob))
+        self.total += len(blob)
+        if self.total > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the blobs fit in ``max_bytes``."""
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            excess = total - self.max_bytes
+            doomed = []
+            for key, size in self.db.execute("SELECT key, size FROM results ORDER BY used"):
+                if excess <= 0:
+                    break
+                doomed.append((key,))
+                excess -= size
+                total -= size
+            self.db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self.total = total
+
+    def run(self, params, scenario, build):
+        """Trajectory of ``build().run()``, simulated only if this (params, scenario) is not cached."""
+        key = self.key(params, scenario)
+        trajectory = self.get(key)
+        if trajectory is None:
+            trajectory = build().run()
+            self.put(key, trajectory)
+        return trajectory
+
+    def stats(self):
+        entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"path": self.path, "entries": entries, "bytes": size, "max_bytes": self.max_bytes,
+                "version": self.version[:12], "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self.db.execute("DELETE FROM results")
+        self.db.execute("VACUUM")
+        self.total = 0
+
+    def close(self):
+        self.db.close()
+
+
+_open_caches = {}
+
+
+def open_cache(path, max_bytes=DEFAULT_MAX_BYTES):
+    """One ResultCache per path and process, so pool workers reuse their connection across tasks."""
+    cache = _open_caches.get(path)
+    if cache is None:
+        cache = _open_caches[path] = ResultCache(path, max_bytes)
+    return cache
+
+
+def run_cached(cache, params, scenario, build):
+    """``cache.run`` when caching (``cache`` is a ResultCache or a path), else just ``build().run()``."""
+    if cache is None:
+        return build().run()
+    if isinstance(cache, str):
+        cache = open_cache(cache)
+    return cache.run(params, scenario, build)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the simulation result cache")
+    parser.add_argument("command", choices=["stats", "clear"])
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    cache = ResultCache(args.path)
+    if args.command == "clear":
+        cache.clear()
+    stats = cache.stats()
+    print(f"{stats['path']}: {stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB "
+          f"of {stats['max_bytes'] / 1e6:.0f} MB, code version {stats['version']}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import math
+import random
+from collections import deque
+
+import numpy as np
+
+from fleet import SpatialGrid
+
+# Waypoints per index cell on average: a few, so a nearest-neighbour query
+# usually ends in the first ring of cells
+POINTS_PER_CELL = 2
+
+
+def random_waypoints(count, rng=random, half_canvas=200, margin=10):
+    """Uniform random waypoints on the canvas."""
+    low, high = -half_canvas + margin, half_canvas - margin
+    return [(rng.uniform(low, high), rng.uniform(low, high)) for _ in range(count)]
+
+
+def _cell_size(xs, ys):
+    """Cell size putting about POINTS_PER_CELL waypoints in each cell of their bounding box.
+
+    Waypoints on (or near) a line have next to no area, so the box is never
+    taken thinner than the cells along its long side.
+    """
+    width, height = float(np.ptp(xs)), float(np.ptp(ys))
+    area = max(width * height, max(width, height) ** 2 * POINTS_PER_CELL / len(xs), 1.0)
+    return max(math.sqrt(area * POINTS_PER_CELL / len(xs)), 1e-6)
+
+
+def nearest_neighbour_order(xs, ys, start, grid):
+    """Greedy tour from ``start``: always drive to the closest waypoint not yet visited.
+
+    Each query searches rings of cells of the spatial index outwards and
+    stops once no closer waypoint can lie further out; visited waypoints are
+    removed from their cell. Once the rings would cover more cells than there
+    are waypoints left, the remaining ones are scanned directly.
+    """
+    buckets = {cell: indices.tolist() for cell, indices in grid.buckets().items()}
+    # Each waypoint's cell as the grid computed it (its floor division can differ from
+    # math.floor(x / cell_size) right on a cell boundary)
+    cell_of = {i: cell for cell, indices in buckets.items() for i in indices}
+    cell_size = grid.cell_size
+    px, py = xs.tolist(), ys.tolist()
+    left = np.ones(len(xs), dtype=bool)
+    remaining = len(xs)
+    x, y = start
+    cx, cy = math.floor(x / cell_size), math.floor(y / cell_size)
+    order = []
+    while remaining:
+        best, best_d2, ring = -1, math.inf, 0
+        while (2 * ring + 1) ** 2 <= remaining:
+            for dx in range(-ring, ring + 1):
+                for dy in ((-ring, ring) if abs(dx) != ring and ring else range(-ring, ring + 1)):
+                    for i in buckets.get((cx + dx, cy + dy), ()):
+                        d2 = (px[i] - x) ** 2 + (py[i] - y) ** 2
+                        if d2 < best_d2:
+                            best, best_d2 = i, d2
+            # Anything beyond this ring is at least ring cells away
+            if best >= 0 and best_d2 <= (ring * cell_size) ** 2:
+                break
+            ring += 1
+        else:
+            candidates = np.flatnonzero(left)
+            best = int(candidates[np.argmin((xs[candidates] - x) ** 2 + (ys[candidates] - y) ** 2)])
+
+        x, y = px[best], py[best]
+        cx, cy = cell_of[best]
+        buckets[cx, cy].remove(best)
+        left[best] = False
+        remaining -= 1
+        order.append(best)
+    return order
+
+
+def nearest_candidates(grid, k):
+    """Up to ``k`` nearest waypoints of each one, among those within one cell size."""
+    i, j = grid.pairs_within(grid.cell_size)
+    i, j = np.concatenate((i, j)), np.concatenate((j, i))
+    d = np.hypot(grid.xs[i] - grid.xs[j], grid.ys[i] - grid.ys[j])
+    by_distance = np.lexsort((d, i))
+    i, j = i[by_distance], j[by_distance]
+    starts = np.searchsorted(i, np.arange(len(grid.xs) + 1))
+    return [j[a:min(b, a + k)].tolist() for a, b in zip(starts, starts[1:])]
+
+
+def two_opt(xs, ys, path, candidates, max_moves=None):
+    """Improve an open path from path[0] (fixed) with 2-opt moves, in place.
+
+    A move reverses path[p..q], replacing the edges into and out of that
+    stretch (only the edge into it when it reaches the end of the path).
+    Moves are only tried that create an edge from a waypoint to one of its
+    ``candidates``, and only around waypoints whose edges changed since they
+    were last checked, so each pass costs O(n k) rather than O(n²).
+    """
+    n = len(path)
+    if n < 4:
+        return path
+    tour = np.array(path)
+    pos = np.empty(n, dtype=np.int64)
+    pos[tour] = np.arange(n)
+
+    def d(a, b):
+        return math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+    def gain(p, q):
+        t = tour
+        removed = d(t[p - 1], t[p]) - d(t[p - 1], t[q])
+        if q < n - 1:
+            removed += d(t[q], t[q + 1]) - d(t[p], t[q + 1])
+        return removed
+
+    queue = deque(tour[1:].tolist())
+    queued = np.ones(n, dtype=bool)
+    moves = 0
+    while queue and (max_moves is None or moves < max_moves):
+        a = queue.popleft()
+        queued[a] = False
+        for c in candidates[a]:
+            i, j = int(pos[a]), int(pos[c])
+            # New edge (a, c): join a's successor side or its predecessor side to c
+            spans = ((i + 1, j) if j > i else (j + 1, i), (j, i - 1) if j < i else (i, j - 1))
+            move = next(((p, q) for p, q in spans if 1 <= p < q and gain(p, q) > 1e-9), None)
+            if move is None:
+                continue
+            p, q = move
+            ends = {int(tour[p - 1]), int(tour[p]), int(tour[q])}
+            if q < n - 1:
+                ends.add(int(tour[q + 1]))
+            tour[p:q + 1] = tour[p:q + 1][::-1].copy()
+            pos[tour[p:q + 1]] = np.arange(p, q + 1)
+            moves += 1
+            for node in ends:
+                if not queued[node] and pos[node]:
+                    queued[node] = True
+                    queue.append(node)
+            break
+    path[:] = tour.tolist()
+    return path
+
+
+def plan_route(waypoints, start=(0, 0), k=8, max_moves=None):
+    """Order waypoints for one continuous mission from ``start``; return their indices.
+
+    Nearest-neighbour construction over a spatial index, then 2-opt
+    restricted to each waypoint's ``k`` nearest candidates. Both stages are
+    driven by the index, so planning grows roughly as O(n log n). Raises
+    ValueError unless the waypoints are finite (x, y) pairs.
+    """
+    if len(waypoints) < 2:
+        return list(range(len(waypoints)))
+    points = np.asarray(waypoints, dtype=float)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError(f"Waypoints must be (x, y) pairs, got shape {points.shape}")
+    if not np.isfinite(points).all() or not np.isfinite(start).all():
+        raise ValueError("Waypoints and start must be finite")
+    xs, ys = points[:, 0], points[:, 1]
+    grid = SpatialGrid(_cell_size(xs, ys)).build(xs, ys)
+    order = nearest_neighbour_order(xs, ys, start, grid)
+
+    # The start is node n of the path, fixed in front
+    n = len(points)
+    xs_all, ys_all = np.append(xs, start[0]).tolist(), np.append(ys, start[1]).tolist()
+    candidates = nearest_candidates(grid, k) + [[]]
+    return two_opt(xs_all, ys_all, [n] + order, candidates, max_moves)[1:]
+
+
+def route_length(waypoints, order, start=(0, 0)):
+    """Length of the polyline from ``start`` through the waypoints in ``order``."""
+    points = np.asarray([start] + [waypoints[i] for i in order], dtype=float)
+    return float(np.hypot(*np.diff(points, axis=0).T).sum())
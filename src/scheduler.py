@@ -0,0 +1,175 @@
+import math
+import time
+
+
+class RateScheduler:
+    """Fixed-rate control clock with deadline compensation.
+
+    Each ``tick()`` sleeps until the next deadline on an absolute schedule
+    (so compute and render time are absorbed instead of added) and returns
+    the measured interval since the previous tick, for use as the control dt.
+    Late ticks are counted as missed deadlines; a tick more than a full period
+    late resynchronizes the schedule instead of bursting to catch up.
+    """
+
+    def __init__(self, frequency, clock=time.perf_counter, sleep=time.sleep):
+        self.period = 1.0 / frequency
+        self.clock = clock
+        self.sleep = sleep
+        self.deadline = None
+        self.last = None
+
+        self.ticks = 0
+        self.missed = 0
+        self.max_lateness = 0.0
+        self._dt_mean = 0.0
+        self._dt_m2 = 0.0  # Running sum of squared deviations (Welford)
+        self._jitter_sum = 0.0
+
+    @property
+    def time_step(self):
+        """Nominal tick interval, matching the fixed-step clocks."""
+        return self.period
+
+    def tick(self):
+        """Wait for the next deadline and return the true time since the last tick."""
+        delay = self.next_deadline()
+        if delay > 0:
+            self.sleep(delay)
+        return self.begin()
+
+    def next_deadline(self):
+        """Book the next deadline and return the seconds left until it, without waiting.
+
+        Event-loop drivers (see TimerLoop) call this after a tick's work, set a
+        timer for the returned delay and call ``begin`` when it fires.
+        """
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = self.last = now
+
+        self.deadline += self.period
+        delay = self.deadline - now
+        if delay <= 0:
+            self.missed += 1
+            if -delay > self.period:
+                self.deadline = now  # Too far behind: drop the missed slots
+        return delay
+
+    def resync(self):
+        """Restart the schedule from now, for a tick run early (e.g. on operator input)."""
+        self.deadline = self.clock()
+        if self.last is None:
+            self.last = self.deadline
+
+    def begin(self):
+        """Start the tick due at the booked deadline; return the true time since the last tick."""
+        now = self.clock()
+        dt = now - self.last
+        self.last = now
+        lateness = now - self.deadline
+        self.max_lateness = max(self.max_lateness, lateness)
+        self._jitter_sum += abs(dt - self.period)
+
+        self.ticks += 1
+        delta = dt - self._dt_mean
+        self._dt_mean += delta / self.ticks
+        self._dt_m2 += delta * (dt - self._dt_mean)
+        return dt
+
+    def stats(self):
+        """Tick count, missed deadlines, measured dt and jitter so far."""
+        return {
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "period": self.period,
+            "dt_mean": self._dt_mean,
+            "dt_std": math.sqrt(self._dt_m2 / self.ticks) if self.ticks else 0.0,
+            "jitter_mean": self._jitter_sum / self.ticks if self.ticks else 0.0,
+            "max_lateness": self.max_lateness,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"{s['ticks']} ticks at {1 / s['period']:.0f} Hz, {s['missed']} missed deadlines, "
+                f"dt {s['dt_mean'] * 1000:.1f} ± {s['dt_std'] * 1000:.1f} ms, "
+                f"mean jitter {s['jitter_mean'] * 1000:.2f} ms")
+
+
+class TimerLoop:
+    """Fixed-rate control loop driven by event-loop timers instead of sleeping.
+
+    ``ontimer(callback, ms)`` schedules a callback on the GUI event loop (e.g.
+    turtle's ``screen.ontimer``), so between ticks the loop stays free to
+    deliver key presses and redraw the window. ``step(dt)`` runs once per
+    tick and returns False to stop. ``kick()`` runs a tick immediately (or
+    ``min_interval`` after the last one), for input that should not wait for
+    the next deadline; the schedule restarts from it, and the timer already
+    pending is ignored when it fires.
+    """
+
+    def __init__(self, ontimer, frequency, step, clock=time.perf_counter, min_interval=None):
+        self.ontimer = ontimer
+        self.step = step
+        self.scheduler = RateScheduler(frequency, clock=clock)
+        self.clock = clock
+        # Kicks closer together than this (e.g. key auto-repeat) wait for the schedule
+        self.min_interval = self.scheduler.period / 5 if min_interval is None else min_interval
+        self.running = False
+        self.busy = False  # In step(): a kick from an event handled meanwhile only brings the next tick forward
+        self.kicked = False
+        self.generation = 0  # Identifies the one timer that is still current
+
+    def start(self):
+        self.running = True
+        self._schedule()
+
+    def stop(self):
+        self.running = False
+
+    def kick(self):
+        """Run the next tick now; return whether it ran."""
+        if not self.running:
+            return False
+        if self.busy:  # Redraws inside step() deliver events; never re-enter it
+            self.kicked = True
+            return False
+        wait = self.min_interval - (self.clock() - self.scheduler.last)
+        if wait > 0:  # Just ticked: bring the next tick forward to the earliest allowed time
+            self.generation += 1
+            generation = self.generation
+            self.ontimer(lambda: self._fire_early(generation), max(math.ceil(wait * 1000), 1))
+            return False
+        self._fire_early(self.generation + 1)
+        return True
+
+    def _schedule(self):
+        self.generation += 1
+        generation = self.generation
+        if self.kicked:  # Input arrived during the last tick: run the next one right away
+            self.kicked = False
+            self.scheduler.resync()
+            delay = 0
+        else:
+            delay = self.scheduler.next_deadline()
+        # At least 1 ms, so a late loop still lets the event loop handle input between ticks
+        self.ontimer(lambda: self._fire(generation), max(round(delay * 1000), 1))
+
+    def _fire_early(self, generation):
+        if self.running and generation >= self.generation:
+            self.scheduler.resync()  # The schedule restarts from this tick
+            self._fire(generation)
+
+    def _fire(self, generation):
+        if not self.running or generation < self.generation:
+            return  # Stopped, or superseded by a kick
+        self.generation = generation
+        self.busy = True
+        try:
+            keep_going = self.step(self.scheduler.begin()) is not False
+        finally:
+            self.busy = False
+        if not keep_going:
+            self.running = False
+            return
+        self._schedule()
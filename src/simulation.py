@@ -0,0 +1,523 @@
+import math
+import random
+from collections import namedtuple
+from controllers import PIDController, GoalController, prioritize_rotation
+from geometry import bearing, distance, goal_errors, wrap_angle
+from instrumentation import profiler
+
+# One simulated tick: pose after the step, the signals the live loops plot and
+# the controller terms behind them (``command`` is the controller's requested
+# acceleration, ``acceleration`` the one actually applied).
+# Samples with dt == 0 end a segment (carrying the exact-stop correction, if any).
+Sample = namedtuple(
+    "Sample",
+    ["time", "dt", "mode", "x", "y", "heading",
+     "velocity", "angular_velocity", "acceleration", "error", "angle_error",
+     "integral", "derivative", "command"],
+    defaults=(0, 0, 0),
+)
+
+
+class SimulatedClock:
+    """Fixed-step clock that advances simulated time without waiting."""
+
+    def __init__(self, time_step):
+        self.time_step = time_step
+
+    def tick(self):
+        """Return the duration of the next step."""
+        return self.time_step
+
+
+class Trajectory:
+    """Samples produced by a simulation run."""
+
+    def __init__(self):
+        self.samples = []
+        self.completed = False
+
+    def append(self, sample):
+        self.samples.append(sample)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __iter__(self):
+        return iter(self.samples)
+
+    def __getitem__(self, index):
+        return self.samples[index]
+
+    def column(self, name):
+        """Return one sample field as a list."""
+        return [getattr(s, name) for s in self.samples]
+
+    @property
+    def steps(self):
+        """Number of integration steps (exact-stop corrections excluded)."""
+        return sum(1 for s in self.samples if s.dt > 0)
+
+    @property
+    def duration(self):
+        """Simulated time covered by the run."""
+        if not self.samples:
+            return 0
+        last = self.samples[-1]
+        return last.time + last.dt
+
+
+def random_spawn(goal_x, goal_y, rng=random):
+    """Pick a start in an opposite quadrant at least 200 pixels from the goal."""
+    half_canvas = 400 // 2  # 200
+    min_distance = 200
+    margin = 50
+
+    spawn_zones = [
+        (-half_canvas + margin, half_canvas - margin),   # Top-left (-200, 200)
+        (-half_canvas + margin, -half_canvas + margin),  # Bottom-left (-200, -200)
+        (half_canvas - margin, -half_canvas + margin)    # Bottom-right (200, -200)
+    ]
+
+    valid_spawns = [
+        (rng.randint(x, x + 100), rng.randint(y, y + 100))
+        for x, y in spawn_zones
+        if abs(goal_x - x) >= min_distance and abs(goal_y - y) >= min_distance
+    ]
+
+    return rng.choice(valid_spawns)
+
+
+class Simulation:
+    """Base class for headless engines: unicycle pose, clock and observers."""
+
+    def __init__(self, start=(0, 0, 0), clock=None, observers=None, record=True):
+        self.x, self.y, self.heading = start
+        self.clock = clock or SimulatedClock(0.1)
+        self.observers = list(observers or [])
+        self.time = 0
+        self.trajectory = Trajectory() if record else None
+
+    def add_observer(self, observer):
+        """Attach an object whose ``update(sample)`` is called every step."""
+        self.observers.append(observer)
+
+    def forward(self, distance):
+        """Move along the current heading (turtle convention, degrees)."""
+        rad = math.radians(self.heading)
+        self.x += distance * math.cos(rad)
+        self.y += distance * math.sin(rad)
+
+    def left(self, angle):
+        """Rotate counterclockwise by ``angle`` degrees."""
+        self.heading = (self.heading + angle) % 360
+
+    def emit(self, sample, timer=None):
+        """Record a sample and hand it to every observer.
+
+        With a profiling ``timer`` each observer's time is marked under its
+        ``phase`` attribute (render, plot, record, ...).
+        """
+        if self.trajectory is not None:
+            self.trajectory.append(sample)
+        if timer is None:
+            for observer in self.observers:
+                observer.update(sample)
+            return
+        for observer in self.observers:
+            observer.update(sample)
+            timer.mark(getattr(observer, "phase", "observe"))
+
+
+class GridSimulation(Simulation):
+    """Headless fixed-step engine for the goal2 grid mission."""
+
+    def __init__(self, velocity_pid=None, angular_pid=None, grid_size=100, grid_steps=4,
+                 max_segment_steps=10000, motion="pid", pattern=None, **kwargs):
+        super().__init__(**kwargs)
+        # "pid" integrates the controllers step by step; "profile" plays back a cached
+        # jerk-limited profile within the same controller limits (see profiles.py);
+        # "adaptive" integrates the continuous PID loop with variable steps and
+        # stops exactly on arrival (see integrators.py, headless only); "compiled"
+        # merges the mission into one continuous velocity plan (see paths.py), limited
+        # in acceleration but not in jerk
+        self.motion = motion
+        self.pattern = pattern  # (rows, cols) coverage pattern instead of the goal2 grid
+        # PID Controllers with acceleration limits (same defaults as GridNavigation)
+        self.velocity_pid = velocity_pid or PIDController(kp=2.0, ki=0.1, kd=0.5, min_output=-3, max_output=15)
+        self.angular_pid = angular_pid or PIDController(kp=1.5, ki=0.05, kd=0.3, min_output=-10, max_output=10)
+        self.grid_size = grid_size
+        self.grid_steps = grid_steps
+        self.max_segment_steps = max_segment_steps  # Guard against gains that never arrive
+        self.stalled = False  # Set when a segment hits the guard before arriving
+
+    def move(self, distance):
+        """Move forward using PID control with limited acceleration and deceleration."""
+        timing = profiler.enabled  # Checked once: disabled, each phase costs one test
+        if self.motion == "profile":
+            return self.play_profile("move", distance)
+        if self.motion == "adaptive":
+            return self.integrate_segment("move", distance)
+        traveled = 0
+        velocity = 0
+        prev_velocity = 0
+
+        steps = 0
+        while traveled < distance:
+            if steps >= self.max_segment_steps:
+                self.stalled = True
+                break
+            steps += 1
+            timer = profiler.tick() if timing else None
+            dt = self.clock.tick()
+            if timer: timer.mark("sleep")
+
+            # PID-controlled acceleration with limits (-3 to 15)
+            acceleration = self.velocity_pid.compute(distance - traveled, velocity, dt)
+            if timer: timer.mark("control")
+            velocity += acceleration * dt
+
+            step = velocity * dt
+            self.forward(step)
+            traveled += step
+
+            # Actual acceleration as plotted by the live loop
+            actual_acceleration = (velocity - prev_velocity) / dt
+            pid = self.velocity_pid
+            sample = Sample(self.time, dt, "move", self.x, self.y, self.heading,
+                            velocity, 0, actual_acceleration, distance - traveled, 0,
+                            pid.integral, pid.derivative, acceleration)
+            if timer: timer.mark("actuate")
+            self.emit(sample, timer)
+
+            self.time += dt
+            prev_velocity = velocity
+
+        self.forward(distance - traveled)  # Ensure exact stopping
+        self.emit(Sample(self.time, 0, "move", self.x, self.y, self.heading, velocity, 0, 0, 0, 0))
+
+    def turn(self, angle):
+        """Turn with controlled angular velocity."""
+        timing = profiler.enabled  # Checked once: disabled, each phase costs one test
+        if self.motion == "profile":
+            return self.play_profile("turn", angle)
+        if self.motion == "adaptive":
+            return self.integrate_segment("turn", angle)
+        rotated = 0
+        angular_velocity = 0
+        prev_angular_velocity = 0
+
+        steps = 0
+        while abs(rotated) < abs(angle):
+            if steps >= self.max_segment_steps:
+                self.stalled = True
+                break
+            steps += 1
+            timer = profiler.tick() if timing else None
+            dt = self.clock.tick()
+            if timer: timer.mark("sleep")
+
+            # PID-controlled angular acceleration
+            angular_acceleration = self.angular_pid.compute(angle - rotated, angular_velocity, dt)
+            if timer: timer.mark("control")
+            angular_velocity += angular_acceleration * dt
+
+            turn_step = angular_velocity * dt
+            self.left(turn_step)
+            rotated += turn_step
+
+            actual_acceleration = (angular_velocity - prev_angular_velocity) / dt
+            pid = self.angular_pid
+            sample = Sample(self.time, dt, "turn", self.x, self.y, self.heading,
+                            0, angular_velocity, actual_acceleration, 0, angle - rotated,
+                            pid.integral, pid.derivative, angular_acceleration)
+            if timer: timer.mark("actuate")
+            self.emit(sample, timer)
+
+            self.time += dt
+            prev_angular_velocity = angular_velocity
+
+        self.left(angle - rotated)  # Ensure exact rotation
+        self.emit(Sample(self.time, 0, "turn", self.x, self.y, self.heading, 0, 0, 0, 0, 0))
+
+    def play_profile(self, mode, amount):
+        """Play back a cached motion profile for a move or turn, ending exactly on target."""
+        from profiles import profile_for  # Imported on use: keeps NumPy off the scalar path
+        pid = self.velocity_pid if mode == "move" else self.angular_pid
+        times, positions, velocities, accelerations = profile_for(pid, amount, self.clock.time_step)
+        x0, y0, heading0 = self.x, self.y, self.heading
+        rad = math.radians(heading0)
+        timing = profiler.enabled
+
+        if self.trajectory is not None or self.observers:
+            prev_time = 0.0
+            for t, position, velocity, acceleration in zip(times, positions, velocities, accelerations):
+                timer = profiler.tick() if timing else None
+                self.clock.tick()
+                if timer: timer.mark("sleep")
+                dt = t - prev_time
+                prev_time = t
+                if mode == "move":
+                    self.x, self.y = x0 + position * math.cos(rad), y0 + position * math.sin(rad)
+                    sample = Sample(self.time, dt, mode, self.x, self.y, self.heading,
+                                    velocity, 0, acceleration, amount - position, 0, 0, 0, acceleration)
+                else:
+                    self.heading = (heading0 + position) % 360
+                    sample = Sample(self.time, dt, mode, self.x, self.y, self.heading,
+                                    0, velocity, acceleration, 0, amount - position, 0, 0, acceleration)
+                if timer: timer.mark("actuate")
+                self.emit(sample, timer)
+                self.time += dt
+        else:
+            self.time += times[-1]  # Nothing observes the path: one lookup and jump to the end
+
+        # Final pose computed from the segment start, so it is exact
+        if mode == "move":
+            self.x, self.y = x0 + amount * math.cos(rad), y0 + amount * math.sin(rad)
+        else:
+            self.heading = (heading0 + amount) % 360
+        self.emit(Sample(self.time, 0, mode, self.x, self.y, self.heading, 0, 0, 0, 0, 0))
+
+    def integrate_segment(self, mode, amount):
+        """Adaptive-step move or turn; arrival is located by root finding, so no correction."""
+        from integrators import integrate, pid_axis_model, arrival
+        pid = self.velocity_pid if mode == "move" else self.angular_pid
+        time_step = self.clock.time_step
+        result = integrate(pid_axis_model(pid, amount), 0, [0, 0, pid.current_acceleration, pid.integral],
+                           t_max=self.max_segment_steps * time_step, events=[arrival(amount)], h0=time_step)
+        if result.event is None:
+            self.stalled = True
+        pid.current_acceleration, pid.integral = result.y[-1][2], result.y[-1][3]
+
+        x0, y0, heading0 = self.x, self.y, self.heading
+        rad = math.radians(heading0)
+        for prev_t, t, (position, velocity, acceleration, integral) in zip(result.t, result.t[1:], result.y[1:]):
+            dt = t - prev_t
+            if mode == "move":
+                self.x, self.y = x0 + position * math.cos(rad), y0 + position * math.sin(rad)
+                sample = Sample(self.time, dt, mode, self.x, self.y, self.heading,
+                                velocity, 0, acceleration, amount - position, 0, integral, 0, acceleration)
+            else:
+                self.heading = (heading0 + position) % 360
+                sample = Sample(self.time, dt, mode, self.x, self.y, self.heading,
+                                0, velocity, acceleration, 0, amount - position, integral, 0, acceleration)
+            self.emit(sample)
+            self.time += dt
+
+        if result.event is not None:  # Exact arrival: land on the target from the segment start
+            if mode == "move":
+                self.x, self.y = x0 + amount * math.cos(rad), y0 + amount * math.sin(rad)
+            else:
+                self.heading = (heading0 + amount) % 360
+        self.emit(Sample(self.time, 0, mode, self.x, self.y, self.heading, 0, 0, 0, 0, 0))
+
+    def waypoints(self):
+        """Waypoints of the mission from the current pose."""
+        from paths import coverage_pattern, grid_pattern
+        if self.pattern:
+            return coverage_pattern(*self.pattern, self.grid_size, (self.x, self.y), self.heading)
+        return grid_pattern(self.grid_steps, self.grid_size, (self.x, self.y), self.heading)
+
+    def run_waypoints(self, waypoints):
+        """Drive through the waypoints: one compiled plan, or a turn and a move per waypoint.
+
+        Both start from the current pose, so waypoints laid out earlier (e.g. on
+        a previous lap) are driven back to rather than jumped to.
+        """
+        if self.motion == "compiled":
+            from paths import compile_path
+            pid = self.velocity_pid
+            # The plan starts at its first point: lead in from the pose (simplify drops it if already there)
+            return self.follow(compile_path([(self.x, self.y), *waypoints], self.heading, pid.max_output,
+                                            -pid.min_output, time_step=self.clock.time_step))
+        for x, y in waypoints:
+            length = distance(self.x, self.y, x, y)
+            if length < 1e-9:
+                continue
+            turn = wrap_angle(bearing(x - self.x, y - self.y) - self.heading)
+            if abs(turn) > 1e-9:
+                self.turn(turn)
+            self.move(length)
+
+    def follow(self, pieces):
+        """Play a compiled plan: in-place turns as profiles, paths along their velocity plan."""
+        timing = profiler.enabled
+        for kind, piece in pieces:
+            if kind == "turn":
+                self.play_profile("turn", piece)
+                continue
+            prev_time = 0.0
+            for t, x, y, heading, velocity, angular_velocity, acceleration, remaining in zip(*piece):
+                timer = profiler.tick() if timing else None
+                self.clock.tick()
+                if timer: timer.mark("sleep")
+                dt = t - prev_time
+                prev_time = t
+                self.x, self.y, self.heading = x, y, heading
+                sample = Sample(self.time, dt, "move", x, y, heading, velocity, angular_velocity,
+                                acceleration, remaining, 0, 0, 0, acceleration)
+                if timer: timer.mark("actuate")
+                self.emit(sample, timer)
+                self.time += dt
+            self.emit(Sample(self.time, 0, "move", self.x, self.y, self.heading, 0, 0, 0, 0, 0))
+
+    def run(self):
+        """Run the full grid pattern and return the trajectory."""
+        if self.pattern or self.motion == "compiled":
+            self.run_waypoints(self.waypoints())
+        else:
+            for _ in range(self.grid_steps):
+                for _ in range(self.grid_steps):
+                    self.move(self.grid_size)  # Move forward
+                self.turn(90)  # Turn left
+                self.move(self.grid_size)  # Move to next row
+                self.turn(90)
+
+        if self.trajectory is not None:
+            self.trajectory.completed = not self.stalled
+        return self.trajectory
+
+
+class GoalSimulation(Simulation):
+    """Headless fixed-step engine for the goal1 navigation to a goal."""
+
+    def __init__(self, goal=(300, 300), controller=None, tolerance=5, max_steps=10000,
+                 integrator="fixed", accel_limits=None, **kwargs):
+        kwargs.setdefault("clock", SimulatedClock(0.05))
+        super().__init__(**kwargs)
+        self.integrator = integrator  # "fixed" ticks, or "adaptive" (continuous law, headless only)
+        self.goal_x, self.goal_y = goal
+        self.controller = controller or GoalController()
+        # Planners (see mpc.py) get the whole pose and choose their own speed
+        self.planner = hasattr(self.controller, "plan")
+        self.accel_limits = accel_limits  # Optional (min, max) px/s² the drive can deliver
+        if self.planner and integrator == "adaptive":
+            raise ValueError("The adaptive integrator needs a continuous v/ω law, not a planner")
+        self.tolerance = tolerance
+        self.max_steps = max_steps
+        self.reached = False
+        self.velocity = 0
+
+    def errors(self):
+        """Return (distance_error, angle_error) from the current pose."""
+        return goal_errors(self.x, self.y, self.heading, self.goal_x, self.goal_y)
+
+    def step(self):
+        """Advance one tick; return the sample, or None once the goal is reached."""
+        timer = profiler.tick() if profiler.enabled else None
+        distance_error, angle_error = self.errors()
+        if timer: timer.mark("sense")
+        if distance_error < self.tolerance:
+            self.reached = True
+            return None
+
+        dt = self.clock.tick()
+        if timer: timer.mark("sleep")
+        if self.planner:
+            v, ω = self.controller.plan(self.x, self.y, self.heading, self.velocity, dt)
+        else:
+            v, ω = self.controller.compute(distance_error, dt, angle_error)
+        command = (v - self.velocity) / dt
+        if timer: timer.mark("control")
+
+        # **Prioritize Rotation if Facing Away from Goal**
+        if not self.planner:
+            v = prioritize_rotation(v, angle_error)  # Reduce forward speed if heading is very wrong
+        if self.accel_limits:
+            # v is px per tick, so a px/s² limit bounds its change per tick by limit * dt²
+            low, high = self.accel_limits
+            v = min(max(v, self.velocity + low * dt * dt), self.velocity + high * dt * dt)
+
+        self.left(ω)
+        self.forward(v)
+
+        acceleration = (v - self.velocity) / dt
+        self.velocity = v
+
+        sample = Sample(self.time, dt, "goal", self.x, self.y, self.heading,
+                        v, ω, acceleration, distance_error, angle_error,
+                        self.controller.integral, self.controller.derivative, command)
+        if timer: timer.mark("actuate")
+        self.emit(sample, timer)
+        self.time += dt
+        return sample
+
+    def run_adaptive(self):
+        """Integrate the continuous v/ω law with adaptive steps up to the exact tolerance crossing."""
+        from integrators import integrate, goal_model, goal_reached
+        tick = self.clock.time_step
+        f = goal_model(self.controller, (self.goal_x, self.goal_y), tick)
+        goal = (self.goal_x, self.goal_y)
+        result = integrate(f, 0, [self.x, self.y, self.heading], t_max=self.max_steps * tick,
+                           events=[goal_reached(goal, self.tolerance)], h0=tick, max_steps=self.max_steps)
+
+        for prev_t, t, state in zip(result.t, result.t[1:], result.y[1:]):
+            distance_error, angle_error = self.errors()
+            rates = f(t, state)
+            self.x, self.y, self.heading = state[0], state[1], state[2] % 360
+            self.emit(Sample(self.time, t - prev_t, "goal", self.x, self.y, self.heading,
+                             math.hypot(rates[0], rates[1]) * tick, rates[2] * tick, 0,
+                             distance_error, angle_error))
+            self.time = t
+
+        self.reached = result.event is not None
+        if self.trajectory is not None:
+            self.trajectory.completed = self.reached
+        return self.trajectory
+
+    def run(self):
+        """Step until the goal is reached (or ``max_steps``) and return the trajectory."""
+        if self.integrator == "adaptive":
+            return self.run_adaptive()
+        steps = 0
+        while self.step() is not None:
+            steps += 1
+            if self.max_steps is not None and steps >= self.max_steps:
+                break
+
+        if self.trajectory is not None:
+            self.trajectory.completed = self.reached
+        return self.trajectory
+
+
+class MissionSimulation(GoalSimulation):
+    """Headless goal1 engine visiting waypoints in order without stopping at any but the last.
+
+    Once within ``tolerance`` of a waypoint the controller is simply retargeted
+    at the next one, keeping its speed and heading. ``arrivals`` holds the time
+    each waypoint was passed. Without ``max_steps`` the run is capped at
+    GoalSimulation's 10000 ticks per waypoint, and is not completed if it
+    hits the cap.
+    """
+
+    def __init__(self, waypoints, max_steps=None, **kwargs):
+        self.waypoints = [tuple(point) for point in waypoints]
+        if not self.waypoints:
+            raise ValueError("A mission needs at least one waypoint")
+        if kwargs.get("integrator") == "adaptive":  # run_adaptive integrates to one goal, never retargeting
+            raise ValueError("The adaptive integrator drives to a single goal; missions need fixed ticks")
+        if max_steps is None:
+            max_steps = 10000 * len(self.waypoints)
+        super().__init__(goal=self.waypoints[0], max_steps=max_steps, **kwargs)
+        if self.planner:  # Planners carry their own goal: aim it at the first waypoint
+            self.controller.goal_x, self.controller.goal_y = self.goal_x, self.goal_y
+        self.target = 0
+        self.arrivals = []
+
+    def retarget(self):
+        """Advance past every waypoint already within tolerance, except the last."""
+        while self.target < len(self.waypoints) - 1:
+            distance_error, _ = self.errors()
+            if distance_error >= self.tolerance:
+                return
+            self.arrivals.append(self.time)
+            self.target += 1
+            self.goal_x, self.goal_y = self.waypoints[self.target]
+            if self.planner:
+                self.controller.goal_x, self.controller.goal_y = self.goal_x, self.goal_y
+
+    def step(self):
+        self.retarget()
+        sample = super().step()
+        if sample is None:
+            self.arrivals.append(self.time)
+        return sample
@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+MAGIC = b"FLYTTLM1"
+HEADER_SIZE = 4096  # Fixed header so the records start at a page boundary for mmap
+
+MODES = ("move", "turn", "goal")
+MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+
+# One record per tick, stored back to back after the header
+RECORD_DTYPE = np.dtype([
+    ("time", "f8"), ("dt", "f4"), ("mode", "u1"),
+    ("x", "f8"), ("y", "f8"), ("heading", "f4"),
+    ("velocity", "f4"), ("angular_velocity", "f4"),
+    ("error", "f4"), ("angle_error", "f4"),
+    ("integral", "f4"), ("derivative", "f4"),
+    ("command", "f4"), ("acceleration", "f4"),
+])
+
+
+class TelemetryRecorder:
+    """Simulation observer that appends every sample to a binary telemetry file.
+
+    Samples are copied into a preallocated structured array and written out a
+    whole chunk at a time, so the per-tick cost is one row assignment.
+    """
+
+    phase = "record"  # Profiling phase (see instrumentation.py)
+
+    def __init__(self, path, chunk_size=4096):
+        self.path = path
+        self.file = open(path, "wb")
+        header = json.dumps({"dtype": RECORD_DTYPE.descr, "modes": MODES}).encode()
+        self.file.write((MAGIC + header).ljust(HEADER_SIZE, b"\0"))
+        self.chunk = np.zeros(chunk_size, dtype=RECORD_DTYPE)
+        self.count = 0
+        self.written = 0
+
+    def update(self, sample):
+        self.chunk[self.count] = (
+            sample.time, sample.dt, MODE_CODES.get(sample.mode, 255),
+            sample.x, sample.y, sample.heading,
+            sample.velocity, sample.angular_velocity,
+            sample.error, sample.angle_error,
+            sample.integral, sample.derivative,
+            sample.command, sample.acceleration,
+        )
+        self.count += 1
+        if self.count == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to disk."""
+        if self.count:
+            self.file.write(self.chunk[:self.count].tobytes())
+            self.written += self.count
+            self.count = 0
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_telemetry(path):
+    """Memory-map a telemetry file; records are only read from disk when accessed."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if not header.startswith(MAGIC):
+        raise ValueError(f"{path} is not a telemetry file")
+    meta = json.loads(header[len(MAGIC):].rstrip(b"\0"))
+    dtype = np.dtype([tuple(field) for field in meta["dtype"]])
+
+    # A crash can leave a partial record at the end; only whole records are mapped
+    count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def iter_chunks(records, chunk_size=1 << 20):
+    """Yield consecutive slices of a (memory-mapped) record array."""
+    for start in range(0, len(records), chunk_size):
+        yield records[start:start + chunk_size]
+
+
+def summarize(path, chunk_size=1 << 20):
+    """Streaming per-field count/min/max/mean/std, reading the file one chunk at a time."""
+    records = open_telemetry(path)
+    fields = [name for name in records.dtype.names if name != "mode"]
+    totals = {name: [0.0, 0.0, np.inf, -np.inf] for name in fields}  # sum, sum², min, max
+    mode_counts = np.zeros(256, dtype=np.int64)
+
+    for chunk in iter_chunks(records, chunk_size):
+        mode_counts += np.bincount(chunk["mode"], minlength=256)
+        for name in fields:
+            values = chunk[name].astype(float)
+            stats = totals[name]
+            stats[0] += values.sum()
+            stats[1] += np.square(values).sum()
+            stats[2] = min(stats[2], values.min())
+            stats[3] = max(stats[3], values.max())
+
+    n = len(records)
+    summary = {"records": n, "modes": {m: int(mode_counts[c]) for m, c in MODE_CODES.items() if mode_counts[c]}}
+    if n:
+        summary["duration"] = float(records["time"][-1] + records["dt"][-1] - records["time"][0])
+        summary["fields"] = {
+            name: {"min": s[2], "max": s[3], "mean": s[0] / n,
+                   "std": float(np.sqrt(max(s[1] / n - (s[0] / n) ** 2, 0)))}
+            for name, s in totals.items()
+        }
+    return summary
+
+
+def replay(path, visualization, fields=("velocity", "acceleration"), modes=None, chunk_size=1 << 16):
+    """Feed recorded samples into a Visualization, as the live PlotObserver would."""
+    records = open_telemetry(path)
+    codes = None if modes is None else [MODE_CODES[m] for m in modes]
+    for chunk in iter_chunks(records, chunk_size):
+        keep = chunk["dt"] > 0  # Exact-stop corrections are not plotted
+        if codes is not None:
+            keep &= np.isin(chunk["mode"], codes)
+        columns = [chunk["time"][keep]] + [chunk[f][keep] for f in fields]
+        for row in zip(*columns):
+            visualization.update(*row)
+    visualization.show()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay telemetry recordings")
+    parser.add_argument("command", choices=["summary", "replay"])
+    parser.add_argument("path")
+    parser.add_argument("--fields", nargs=2, default=["velocity", "acceleration"],
+                        help="Two record fields to plot when replaying")
+    parser.add_argument("--modes", nargs="*", choices=MODES, help="Only replay these modes")
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        print(json.dumps(summarize(args.path), indent=2))
+    else:
+        from visualization import Visualization
+        replay(args.path, Visualization(), args.fields, args.modes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import itertools
+import math
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cli import write_json
+from controllers import PIDController, GoalController
+from metrics import segments, settling_time, overshoot, acceleration_violations, goal_acceleration, path_length
+from resultcache import DEFAULT_PATH, controller_params, run_cached
+from simulation import GridSimulation, GoalSimulation, SimulatedClock, random_spawn
+
+# Scores are minimized; a candidate that never arrives gets inf time-to-goal. The goal1
+# missions stop on arrival, so instead of overshoot they score the detour: path
+# length over the straight-line distance, minus one
+OBJECTIVES = {
+    "grid": ("settling_time", "overshoot", "accel_violations", "time_to_goal"),
+    "goal": ("settling_time", "path_excess", "accel_violations", "time_to_goal"),
+}
+
+# Search ranges for the velocity PID (goal2) and the v/ω law (goal1)
+SPACES = {
+    "grid": {"kp": (0.5, 4.0), "ki": (0.0, 0.5), "kd": (0.0, 1.5)},
+    "goal": {"Kv": (0.2, 1.0), "Kω": (0.02, 0.3), "Kω2": (0.0, 0.2)},
+}
+
+TuningResult = namedtuple("TuningResult", ["params", "scores"])
+
+
+def score_grid(params, grid_size=100, grid_steps=4, time_step=0.1, cache=None):
+    """Run one headless grid mission with the given velocity gains and score it.
+
+    With a ``cache`` (ResultCache or path), runs seen before are read back instead of simulated.
+    """
+    velocity_pid = PIDController(params["kp"], params["ki"], params["kd"], min_output=-3, max_output=15)
+    scenario = {"mission": "grid", "grid_size": grid_size, "grid_steps": grid_steps, "time_step": time_step}
+    trajectory = run_cached(cache, controller_params(velocity_pid), scenario, lambda: GridSimulation(
+        velocity_pid=velocity_pid, grid_size=grid_size, grid_steps=grid_steps, clock=SimulatedClock(time_step)))
+
+    settle, over, violations = [], 0.0, 0
+    for segment in segments(trajectory):
+        if segment[0].mode != "move":
+            continue
+        # The exact-stop correction ends every segment on target (zero error)
+        times = [s.time for s in segment] + [segment[-1].time + segment[-1].dt]
+        errors = [s.error for s in segment] + [0.0]
+        settle.append(settling_time(times, errors, 0.02 * grid_size))
+        over = max(over, overshoot(errors, grid_size))
+        violations += acceleration_violations([s.acceleration for s in segment])
+
+    return {
+        "settling_time": float(np.mean(settle)) if settle else math.inf,
+        "overshoot": over,
+        "accel_violations": violations,
+        "time_to_goal": trajectory.duration if trajectory.completed else math.inf,
+    }
+
+
+def score_goal(params, seeds=range(8), time_step=0.05, cache=None):
+    """Run goal1 missions from seeded spawns with the given v/ω gains and score them."""
+    settle, excess, violations, durations = [], [], 0, []
+    for seed in seeds:
+        start_x, start_y = random_spawn(300, 300, random.Random(seed))
+        controller = GoalController(Kv=params["Kv"], Kω=params["Kω"], Kω2=params["Kω2"])
+        scenario = {"mission": "goal", "goal": (300, 300), "start": (start_x, start_y, 0), "time_step": time_step}
+        trajectory = run_cached(cache, controller_params(controller), scenario, lambda: GoalSimulation(
+            controller=controller, start=(start_x, start_y, 0), clock=SimulatedClock(time_step)))
+        if not trajectory.completed:
+            return dict.fromkeys(OBJECTIVES["goal"], math.inf)
+
+        straight = math.hypot(300 - start_x, 300 - start_y)
+        times = trajectory.column("time")
+        settle.append(settling_time(times, trajectory.column("error"), 0.02 * straight))
+        xs = [start_x] + trajectory.column("x")
+        ys = [start_y] + trajectory.column("y")
+        excess.append(path_length(xs, ys) / straight - 1)
+        violations += acceleration_violations(goal_acceleration(np.array(trajectory.column("acceleration")), time_step))
+        durations.append(trajectory.duration)
+
+    return {
+        "settling_time": float(np.mean(settle)),
+        "path_excess": float(np.mean(excess)),
+        "accel_violations": violations,
+        "time_to_goal": float(np.mean(durations)),
+    }
+
+
+SCORERS = {"grid": score_grid, "goal": score_goal}
+
+
+def evaluate(task):
+    """Score one (mission, params, cache) candidate; module-level so worker processes can pickle it."""
+    mission, params, cache = task
+    return TuningResult(params, SCORERS[mission](params, cache=cache))
+
+
+def grid_candidates(space, samples):
+    """Evenly spaced values per gain, roughly ``samples`` combinations in total."""
+    per_axis = max(2, round(samples ** (1 / len(space))))
+    axes = [np.linspace(lo, hi, per_axis) for lo, hi in space.values()]
+    return [dict(zip(space, map(float, values))) for values in itertools.product(*axes)]
+
+
+def random_candidates(space, samples, rng):
+    """Uniform random gains within the search ranges."""
+    return [{name: rng.uniform(lo, hi) for name, (lo, hi) in space.items()} for _ in range(samples)]
+
+
+def scalarize(results):
+    """Collapse objective vectors into one cost per result (equal-weight, normalized)."""
+    scores = np.array([list(r.scores.values()) for r in results], dtype=float)
+    finite = np.isfinite(scores)
+    worst = np.where(finite, scores, -np.inf).max(axis=0)
+    scores = np.where(finite, scores, np.where(np.isfinite(worst), 2 * worst + 1, 1.0))
+    scores = np.log1p(np.maximum(scores, 0))
+    span = scores.max(axis=0) - scores.min(axis=0)
+    return ((scores - scores.min(axis=0)) / np.where(span > 0, span, 1)).sum(axis=1)
+
+
+def _normal_cdf(z):
+    return 0.5 * (1 + np.vectorize(math.erf)(z / math.sqrt(2)))
+
+
+def propose(space, results, count, rng, pool_size=2000, length_scale=0.2):
+    """Pick ``count`` new candidates by expected improvement under a Gaussian-process fit."""
+    names = list(space)
+    lo = np.array([space[n][0] for n in names])
+    span = np.array([space[n][1] - space[n][0] for n in names])
+    span = np.where(span > 0, span, 1)
+
+    X = (np.array([[r.params[n] for n in names] for r in results]) - lo) / span
+    y = scalarize(results)
+    y = (y - y.mean()) / (y.std() or 1)
+
+    def kernel(a, b):
+        d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * d2 / length_scale ** 2)
+
+    K = kernel(X, X) + 1e-6 * np.eye(len(X))
+    L = np.linalg.cholesky(K)
+    alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+
+    pool = np.array([[rng.random() for _ in names] for _ in range(pool_size)])
+    Ks = kernel(pool, X)
+    mu = Ks @ alpha
+    v = np.linalg.solve(L, Ks.T)
+    sigma = np.sqrt(np.maximum(1 - (v ** 2).sum(axis=0), 1e-12))
+
+    # Expected improvement over the best cost seen so far
+    improvement = y.min() - mu - 0.01
+    z = improvement / sigma
+    ei = improvement * _normal_cdf(z) + sigma * np.exp(-0.5 * z ** 2) / math.sqrt(2 * math.pi)
+
+    best = pool[np.argsort(-ei)[:count]]
+    return [dict(zip(names, map(float, lo + row * span))) for row in best]
+
+
+def pareto_front(results):
+    """Return the results not dominated on every objective by any other result."""
+    scores = np.array([list(r.scores.values()) for r in results], dtype=float)
+    front = []
+    for i, row in enumerate(scores):
+        dominated = np.any(np.all(scores <= row, axis=1) & np.any(scores < row, axis=1))
+        if not dominated:
+            front.append(results[i])
+    return front
+
+
+def tune(mission="grid", strategy="random", samples=200, workers=None, seed=0, space=None, cache=None):
+    """Search gains for ``mission`` across a process pool; return (results, pareto_front).
+
+    ``cache`` is the path of a ResultCache shared by the workers, so a repeated
+    sweep only simulates the candidates it has not seen.
+    """
+    space = space or SPACES[mission]
+    rng = random.Random(seed)
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def run(candidates):
+            chunksize = max(1, len(candidates) // (4 * workers))
+            return list(pool.map(evaluate, [(mission, c, cache) for c in candidates], chunksize=chunksize))
+
+        if strategy == "grid":
+            results = run(grid_candidates(space, samples))
+        elif strategy == "random":
+            results = run(random_candidates(space, samples, rng))
+        elif strategy == "bayesian":
+            # Random warm-up, then batches proposed by the surrogate model
+            batch = workers
+            results = run(random_candidates(space, max(batch, samples // 4), rng))
+            while len(results) < samples:
+                results += run(propose(space, results, min(batch, samples - len(results)), rng))
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+
+    return results, pareto_front(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel PID gain tuner")
+    parser.add_argument("mission", choices=sorted(SCORERS), help="grid (goal2 velocity PID) or goal (goal1 v/ω law)")
+    parser.add_argument("--strategy", choices=["grid", "random", "bayesian"], default="random")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the Pareto front as JSON to this file (inf scores as null)")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_PATH, metavar="PATH",
+                        help="Reuse simulated runs from this result cache (see resultcache.py)")
+    args = parser.parse_args()
+
+    results, front = tune(args.mission, args.strategy, args.samples, args.workers, args.seed, cache=args.cache)
+    front.sort(key=lambda r: r.scores["time_to_goal"])
+
+    print(f"Evaluated {len(results)} candidates, {len(front)} on the Pareto front:")
+    for r in front:
+        gains = ", ".join(f"{k}={v:.3f}" for k, v in r.params.items())
+        scores = ", ".join(f"{k}={r.scores[k]:.3g}" for k in OBJECTIVES[args.mission])
+        print(f"  {gains}  ->  {scores}")
+
+    if args.output:
+        write_json(args.output, [r._asdict() for r in front])
+
+
+if __name__ == "__main__":
+    main()
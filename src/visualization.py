@@ -1,19 +1,129 @@
-import turtle
 import time
+import numpy as np
 import matplotlib.pyplot as plt
-# from visualization import Visualization
+
+LONG_RUN_HISTORY = 10000  # Rows kept for the final plot in long-run mode
+
+
+class RingBuffer:
+    """Preallocated circular store of fixed-width rows; appends are O(1)."""
+
+    def __init__(self, capacity, columns):
+        self.data = np.empty((capacity, columns))
+        self.capacity = capacity
+        self.count = 0
+        self.index = 0  # Next row to write
+
+    def append(self, row):
+        self.data[self.index] = row
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def view(self):
+        """Return the stored rows, oldest first."""
+        if self.count < self.capacity:
+            return self.data[:self.count]
+        return np.concatenate((self.data[self.index:], self.data[:self.index]))
+
+
+class History:
+    """Rows kept for the final plot, in fixed-size chunks.
+
+    A full chunk is never copied: appending starts a new one, so every
+    append costs the same on the render path. ``view`` joins the chunks once,
+    when the run is plotted.
+    """
+
+    def __init__(self, columns, capacity=1024):
+        self.columns = columns
+        self.capacity = capacity  # Rows per chunk
+        self.chunks = [np.empty((capacity, columns))]
+        self.count = 0  # Rows in the last chunk
+
+    def append(self, row):
+        if self.count == self.capacity:
+            self.chunks.append(np.empty((self.capacity, self.columns)))
+            self.count = 0
+        self.chunks[-1][self.count] = row
+        self.count += 1
+
+    def __len__(self):
+        return (len(self.chunks) - 1) * self.capacity + self.count
+
+    def view(self):
+        if len(self.chunks) == 1:
+            return self.chunks[0][:self.count]
+        return np.concatenate(self.chunks[:-1] + [self.chunks[-1][:self.count]])
+
+
+class DecimatedHistory:
+    """Fixed-size store of the whole run at progressively coarser resolution.
+
+    Keeps every ``stride``-th row; when the store fills up, every other row
+    is dropped and the stride doubles. Memory stays at ``size`` rows however
+    long the run, and the kept rows always span it from start to finish.
+    """
+
+    def __init__(self, columns, size=10000):
+        self.data = np.empty((size - size % 2, columns))
+        self.count = 0
+        self.stride = 1
+        self.seen = 0  # Rows offered so far
+
+    def append(self, row):
+        self.seen += 1
+        if (self.seen - 1) % self.stride:
+            return
+        if self.count == len(self.data):
+            half = self.count // 2
+            self.data[:half] = self.data[::2]
+            self.count = half
+            self.stride *= 2
+            if (self.seen - 1) % self.stride:
+                return
+        self.data[self.count] = row
+        self.count += 1
+
+    def view(self):
+        return self.data[:self.count]
+
+
+def minmax_downsample(x, y, buckets):
+    """Reduce (x, y) to the min and max of each of ``buckets`` equal-count chunks.
+
+    Keeps every peak visible, so a long run plots like the full data at a
+    fraction of the points (two per bucket, about one bucket per pixel).
+    """
+    n = len(x)
+    if buckets <= 0 or n <= 2 * buckets:
+        return x, y
+    chunk = -(-n // buckets)  # Ceiling division
+    padded = np.pad(y, (0, chunk * buckets - n), mode="edge").reshape(buckets, chunk)
+    offsets = np.arange(buckets) * chunk
+    lo = np.minimum(offsets + padded.argmin(axis=1), n - 1)
+    hi = np.minimum(offsets + padded.argmax(axis=1), n - 1)
+    index = np.sort(np.concatenate((lo, hi)))
+    return x[index], y[index]
+
 
 class Visualization:
-    def __init__(self):
-        """Initialize real-time plots."""
+    def __init__(self, capacity=2000, fps=20, history=None):
+        """Initialize real-time plots.
+
+        The live view holds the last ``capacity`` samples in a ring buffer and
+        redraws at most ``fps`` times per second, so the cost of ``update``
+        does not grow with run length. The final plot keeps every sample, or
+        with ``history`` a fixed number of rows spread over the whole run.
+        """
         plt.ion()  # Enable interactive mode
         self.fig, self.axs = plt.subplots(3, 1, figsize=(8, 9))
+        self.blit = self.fig.canvas.supports_blit
 
         # Velocity vs Time
         self.axs[0].set_title("Velocity vs Time")
         self.axs[0].set_xlabel("Time (s)")
         self.axs[0].set_ylabel("Velocity (px/s)")
-        self.vel_line, = self.axs[0].plot([], [], label="Velocity", color="blue")
+        self.vel_line, = self.axs[0].plot([], [], label="Velocity", color="blue", animated=self.blit)
         self.axs[0].legend()
         self.axs[0].grid(True)
 
@@ -21,37 +131,85 @@ class Visualization:
         self.axs[1].set_title("Acceleration vs Time")
         self.axs[1].set_xlabel("Time (s)")
         self.axs[1].set_ylabel("Acceleration (px/s²)")
-        self.acc_line, = self.axs[1].plot([], [], label="Acceleration", color="red")
+        self.acc_line, = self.axs[1].plot([], [], label="Acceleration", color="red", animated=self.blit)
         self.axs[1].legend()
         self.axs[1].grid(True)
 
+        self.lines = [(self.axs[0], self.vel_line), (self.axs[1], self.acc_line)]
+        self.buffer = RingBuffer(capacity, 3)  # time, velocity, acceleration
+        self.history = DecimatedHistory(3, history) if history else History(3)
+
+        self.frame_interval = 1.0 / fps if fps else 0
+        self.last_draw = float("-inf")
+        self.background = None
+        self.fig.canvas.mpl_connect("draw_event", self._capture_background)
+
+    def _capture_background(self, event):
+        """Store the static figure (axes, grid, labels) for blitting."""
+        if self.blit:
+            self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
     def update(self, time_elapsed, velocity, acceleration):
         """Update the visualization with new data."""
-        x_data = list(self.vel_line.get_xdata())
-        y_vel_data = list(self.vel_line.get_ydata())
-        y_acc_data = list(self.acc_line.get_ydata())
+        row = (time_elapsed, velocity, acceleration)
+        self.buffer.append(row)
+        self.history.append(row)
 
-        x_data.append(time_elapsed)
-        y_vel_data.append(velocity)
-        y_acc_data.append(acceleration)
+        # Drawing is decoupled from sampling: redraw only once per frame interval
+        now = time.perf_counter()
+        if now - self.last_draw >= self.frame_interval:
+            self.last_draw = now
+            self.redraw()
 
-        self.vel_line.set_xdata(x_data)
-        self.vel_line.set_ydata(y_vel_data)
-        self.axs[0].relim()
-        self.axs[0].autoscale_view()
+    def _expand_limits(self, data):
+        """Grow axis limits to fit the data; return True if any limit changed."""
+        t = data[:, 0]
+        changed = False
+        for column, (ax, _) in enumerate(self.lines, start=1):
+            xmin, xmax = ax.get_xlim()
+            if t[-1] > xmax or t[0] < xmin:
+                span = max(t[-1] - t[0], 1.0)
+                ax.set_xlim(t[0], t[-1] + 0.5 * span)  # Headroom so resizes stay rare
+                changed = True
 
-        self.acc_line.set_xdata(x_data)
-        self.acc_line.set_ydata(y_acc_data)
-        self.axs[1].relim()
-        self.axs[1].autoscale_view()
+            y = data[:, column]
+            lo, hi = y.min(), y.max()
+            ymin, ymax = ax.get_ylim()
+            if lo < ymin or hi > ymax:
+                margin = 0.1 * max(hi - lo, 1.0)
+                ax.set_ylim(min(lo - margin, ymin), max(hi + margin, ymax))
+                changed = True
+        return changed
 
-        plt.draw()
-        plt.pause(0.001)  # Allow real-time updates without blocking
+    def redraw(self):
+        """Draw the buffered window, blitting only the lines when axes are unchanged."""
+        data = self.buffer.view()
+        if not len(data):
+            return
+        for column, (_, line) in enumerate(self.lines, start=1):
+            line.set_data(data[:, 0], data[:, column])
+
+        canvas = self.fig.canvas
+        if self._expand_limits(data) or self.background is None or not self.blit:
+            canvas.draw()  # Full redraw; recaptures the background
+        if self.blit:
+            canvas.restore_region(self.background)
+            for ax, line in self.lines:
+                ax.draw_artist(line)
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()  # Keep the window responsive without plt.pause
 
     def show(self):
         """Display the final plots after execution."""
+        data = self.history.view()
+        width = int(self.fig.get_size_inches()[0] * self.fig.dpi)  # One bucket per pixel
+        for column, (ax, line) in enumerate(self.lines, start=1):
+            line.set_animated(False)
+            line.set_data(*minmax_downsample(data[:, 0], data[:, column], width))
+            ax.relim()
+            ax.autoscale_view()
+
         plt.ioff()  # Disable interactive mode
         plt.show()
 
 # Run the navigation
-
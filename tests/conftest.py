@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules live flat in src/ and import each other by bare name, as when run from there
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
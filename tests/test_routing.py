@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+import pytest
+
+from fleet import SpatialGrid
+from routing import _cell_size, nearest_neighbour_order, plan_route, random_waypoints, route_length
+
+
+def nearest_neighbour_length(waypoints, start):
+    """Length of the nearest-neighbour route plan_route starts its 2-opt from."""
+    points = np.asarray(waypoints, dtype=float)
+    xs, ys = points[:, 0], points[:, 1]
+    grid = SpatialGrid(_cell_size(xs, ys)).build(xs, ys)
+    return route_length(points, nearest_neighbour_order(xs, ys, start, grid), start)
+
+
+def layouts():
+    rng = random.Random(0)
+    for count in (2, 3, 10, 100, 1000):
+        yield random_waypoints(count, rng)
+    yield [(x, 0.0) for x in range(50)]  # Collinear
+    yield [(x, 2.0 * x) for x in range(-20, 20)]  # Collinear, diagonal
+    yield [(1.0, 1.0)] * 5 + [(2.0, 2.0)] * 5  # Duplicates
+    yield [(rng.gauss(cx, 1), rng.gauss(cy, 1)) for cx, cy in ((-150, -150), (150, 150)) for _ in range(50)]
+
+
+@pytest.mark.parametrize("waypoints", list(layouts()))
+@pytest.mark.parametrize("start", [(0, 0), (-200, 180)])
+def test_plan_route_visits_every_waypoint_once(waypoints, start):
+    assert sorted(plan_route(waypoints, start)) == list(range(len(waypoints)))
+
+
+@pytest.mark.parametrize("waypoints", list(layouts()))
+@pytest.mark.parametrize("start", [(0, 0), (-200, 180)])
+def test_plan_route_is_no_longer_than_nearest_neighbour(waypoints, start):
+    route = plan_route(waypoints, start)
+    assert route_length(waypoints, route, start) <= nearest_neighbour_length(waypoints, start) + 1e-6 * len(waypoints)
+
+
+@pytest.mark.parametrize("count", [0, 1])
+def test_plan_route_trivial(count):
+    assert plan_route(random_waypoints(count)) == list(range(count))
+
+
+@pytest.mark.parametrize("waypoints", [[(0, 0, 0), (1, 1, 1)], [(0, 0), (float("nan"), 1)],
+                                       [(0, 0), (float("inf"), 1)]])
+def test_plan_route_rejects_bad_waypoints(waypoints):
+    with pytest.raises(ValueError):
+        plan_route(waypoints)